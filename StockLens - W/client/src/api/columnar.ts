@@ -0,0 +1,46 @@
+/**
+ * Decoder for the server's columnar candle format
+ * (application/vnd.stocklens.columnar, see server/core/columnar.py):
+ *   "SLC1" | u32 header length | JSON header (padded to 8-byte alignment)
+ *   t: i64 first timestamp + i32 deltas | o, h, l, c: f32 each
+ * All little-endian.
+ */
+export const COLUMNAR = "application/vnd.stocklens.columnar";
+
+const COLS = ["o", "h", "l", "c"] as const;
+
+// missing bars travel as NaN; JSON callers have always seen null
+const toNumbers = (a: Float32Array) =>
+  Array.from(a, (v) => (Number.isNaN(v) ? (null as unknown as number) : v));
+
+export function decodeColumnar<T>(buf: ArrayBuffer): T {
+  const view = new DataView(buf);
+  const magic = String.fromCharCode(...new Uint8Array(buf, 0, 4));
+  if (magic !== "SLC1") throw new Error("not a columnar candle payload");
+  const hlen = view.getUint32(4, true);
+  const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buf, 8, hlen)));
+  const n: Record<string, number> = header.n;
+  delete header.n;
+
+  let off = 8 + hlen;
+  const t: number[] = [];
+  if (n.t) {
+    let ts = Number(view.getBigInt64(off, true));
+    t.push(ts);
+    const deltas = new Int32Array(buf, off + 8, n.t - 1);
+    for (const d of deltas) t.push((ts += d));
+    off += 8 + 4 * (n.t - 1);
+  }
+  const out: Record<string, unknown> = { ...header, t };
+  for (const col of COLS) {
+    out[col] = toNumbers(new Float32Array(buf, off, n[col]));
+    off += 4 * n[col];
+  }
+  return out as T;
+}
+
+/** Parse a response fetched with responseType "arraybuffer": columnar or JSON by content type. */
+export function decodeBody<T>(buf: ArrayBuffer, contentType: string | undefined): T {
+  if (contentType?.startsWith(COLUMNAR)) return decodeColumnar<T>(buf);
+  return JSON.parse(new TextDecoder().decode(buf)) as T;
+}
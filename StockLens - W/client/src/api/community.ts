@@ -1,22 +1,47 @@
-import client from "./client";
-
-export const listThreads = async (symbol?: string) =>
-  (await client.get(`/community/threads`, { params: { symbol } })).data;
-
-export const createThread = async (symbol: string, title: string, stance: "buy"|"sell"|"neutral", body: string) =>
-  (await client.post(`/community/threads`, { symbol, title, stance, body })).data;
-
-export const listComments = async (threadId: string) =>
-  (await client.get(`/community/comments`, { params: { threadId } })).data;
-
-export const addComment = async (threadId: string, body: string) =>
-  (await client.post(`/community/comments`, { threadId, body })).data;
-
-export const vote = async (type: "thread"|"comment", entityId: string, up=true) =>
-  (await client.post(`/community/vote`, { type, entityId, up })).data;
-
-export const communitySentiment = async (symbol: string) =>
-  (await client.get(`/community/sentiment`, { params: { symbol } })).data;
-
-export const summarizeCommunity = async (symbol: string) =>
-  (await client.get(`/summaries/community/${symbol}`)).data;
+import client from "./client";
+
+export type PageOpts = { cursor?: string; limit?: number; fields?: string };
+export type ThreadSort = "new" | "hot" | "top";
+
+export const listThreads = async (symbol?: string, opts: PageOpts & { sort?: ThreadSort } = {}) =>
+  (await client.get(`/community/threads`, { params: { symbol, ...opts } })).data;
+
+export const createThread = async (symbol: string, title: string, stance: "buy"|"sell"|"neutral", body: string) =>
+  (await client.post(`/community/threads`, { symbol, title, stance, body })).data;
+
+export const listComments = async (threadId: string, opts: PageOpts = {}) =>
+  (await client.get(`/community/comments`, { params: { threadId, ...opts } })).data;
+
+export const getThreadFull = async (threadId: string, limit?: number) =>
+  (await client.get(`/community/threads/${threadId}/full`, { params: { limit } })).data;
+
+export const addComment = async (threadId: string, body: string) =>
+  (await client.post(`/community/comments`, { threadId, body })).data;
+
+export const vote = async (type: "thread"|"comment", entityId: string, up=true) =>
+  (await client.post(`/community/vote`, { type, entityId, up })).data;
+
+export const communitySentiment = async (symbol: string) =>
+  (await client.get(`/community/sentiment`, { params: { symbol } })).data;
+
+export const summarizeCommunity = async (symbol: string) =>
+  (await client.get(`/summaries/community/${symbol}`)).data;
+
+/** Stream the community summary over SSE; returns a function that stops the stream. */
+export const streamCommunitySummary = (
+  symbol: string,
+  onText: (text: string) => void,
+  onDone: (summary: string) => void,
+  onError: (error: string) => void,
+) => {
+  const es = new EventSource(`${client.defaults.baseURL}/summaries/community/${symbol}/stream`);
+  es.addEventListener("token", (e) => onText(JSON.parse((e as MessageEvent).data).text));
+  es.addEventListener("done", (e) => { es.close(); onDone(JSON.parse((e as MessageEvent).data).summary); });
+  // the server's `event: error` carries a message; a dropped connection doesn't
+  es.addEventListener("error", (e) => {
+    es.close();
+    const data = (e as MessageEvent).data;
+    onError(data ? JSON.parse(data).error : "summary stream failed");
+  });
+  return () => es.close();
+};
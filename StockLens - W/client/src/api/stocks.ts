@@ -1,37 +1,52 @@
-import client from "./client";
-
-/** --- API response types (minimal, just what we use) --- */
-export type Quote = {
-  ok: boolean;
-  c?: number;  d?: number;  dp?: number;
-  h?: number;  l?: number;  o?: number;  pc?: number;
-  t?: number;
-};
-
-export type Candles = {
-  ok: boolean;
-  s: string;
-  symbol: string;
-  t: number[]; c: number[]; o: number[]; h: number[]; l: number[];
-  meta?: { source?: string; resolution?: string; from?: number; to?: number; count?: number; };
-};
-
-export type Profile = { ok: boolean; ticker?: string; name?: string; exchange?: string; currency?: string; };
-export type Metrics = { ok: boolean; metric?: Record<string, unknown>; };
-
-/** Generic safe GET that preserves the type of data */
-async function safeGet<T>(url: string, params: any = {}): Promise<T | null> {
-  try {
-    const res = await client.get(url, { params });
-    return (res.data as T) ?? null;
-  } catch {
-    return null;
-  }
-}
-
-/** Typed API helpers */
-export const getQuote   = (symbol: string) => safeGet<Quote>("/stocks/quote", { symbol });
-export const getCandles = (symbol: string, resolution: "D" | "W" | "M" | "60" = "D", count = 180) =>
-  safeGet<Candles>("/stocks/candles", { symbol, resolution, count });
-export const getProfile = (symbol: string) => safeGet<Profile>("/stocks/profile", { symbol });
-export const getMetrics = (symbol: string) => safeGet<Metrics>("/stocks/metrics", { symbol });
+import client from "./client";
+import { COLUMNAR, decodeBody } from "./columnar";
+
+/** --- API response types (minimal, just what we use) --- */
+export type Quote = {
+  ok: boolean;
+  c?: number;  d?: number;  dp?: number;
+  h?: number;  l?: number;  o?: number;  pc?: number;
+  t?: number;
+};
+
+export type Quotes = { ok: boolean; quotes?: Record<string, Quote & { error?: string }>; };
+
+export type Candles = {
+  ok: boolean;
+  s: string;
+  symbol: string;
+  t: number[]; c: number[]; o: number[]; h: number[]; l: number[];
+  meta?: { source?: string; resolution?: string; from?: number; to?: number; count?: number; };
+};
+
+export type Profile = { ok: boolean; ticker?: string; name?: string; exchange?: string; currency?: string; };
+export type Metrics = { ok: boolean; metric?: Record<string, unknown>; };
+
+/** Generic safe GET that preserves the type of data */
+async function safeGet<T>(url: string, params: any = {}): Promise<T | null> {
+  try {
+    const res = await client.get(url, { params });
+    return (res.data as T) ?? null;
+  } catch {
+    return null;
+  }
+}
+
+/** Typed API helpers */
+export const getQuote   = (symbol: string) => safeGet<Quote>("/stocks/quote", { symbol });
+export const getQuotes  = (symbols: string[]) => safeGet<Quotes>("/stocks/quotes", { symbols: symbols.join(",") });
+/** Candles come over the compact columnar format when the server offers it (JSON otherwise). */
+export async function getCandles(symbol: string, resolution: "D" | "W" | "M" | "60" = "D", count = 180) {
+  try {
+    const res = await client.get<ArrayBuffer>("/stocks/candles", {
+      params: { symbol, resolution, count },
+      headers: { Accept: `${COLUMNAR}, application/json;q=0.9` },
+      responseType: "arraybuffer",
+    });
+    return decodeBody<Candles>(res.data, res.headers["content-type"]) ?? null;
+  } catch {
+    return null;
+  }
+}
+export const getProfile = (symbol: string) => safeGet<Profile>("/stocks/profile", { symbol });
+export const getMetrics = (symbol: string) => safeGet<Metrics>("/stocks/metrics", { symbol });
@@ -1,116 +1,212 @@
-from flask import Blueprint, request, jsonify
-from bson import ObjectId
-from core.db import threads, comments, votes
-from core.auth import require_auth
-from core.utils import utcnow
-from models.schemas import validate_thread, validate_comment
-
-community_bp = Blueprint("community", __name__, url_prefix="/api/community")
-
-def _oid(x): return ObjectId(x) if isinstance(x, str) else x
-
-@community_bp.get("/threads")
-def list_threads():
-    symbol = (request.args.get("symbol") or "").upper().strip()
-    q = {"symbol": symbol} if symbol else {}
-    items = []
-    for t in threads.find(q).sort("createdAt", -1).limit(50):
-        t["_id"] = str(t["_id"])
-        items.append(t)
-    return jsonify({"threads": items})
-
-@community_bp.post("/threads")
-@require_auth
-def create_thread():
-    data = validate_thread(request.get_json(force=True))
-    doc = {
-        **data,
-        "createdBy": request.user_id,
-        "createdAt": utcnow(),
-        "up": 0, "down": 0,
-        "reliabilityScore": 0.0,
-    }
-    _id = threads.insert_one(doc).inserted_id
-    doc["_id"] = str(_id)
-    return jsonify(doc)
-
-@community_bp.get("/comments")
-def list_comments():
-    tid = request.args.get("threadId")
-    if not tid: return jsonify({"error":"threadId required"}), 400
-    items = []
-    for c in comments.find({"threadId": _oid(tid)}).sort("createdAt", 1).limit(200):
-        c["_id"] = str(c["_id"]); c["threadId"] = str(c["threadId"])
-        items.append(c)
-    return jsonify({"comments": items})
-
-@community_bp.post("/comments")
-@require_auth
-def add_comment():
-    data = validate_comment(request.get_json(force=True))
-    doc = {
-        **data,
-        "threadId": _oid(data["threadId"]),
-        "createdBy": request.user_id,
-        "createdAt": utcnow(),
-        "up": 0, "down": 0,
-    }
-    _id = comments.insert_one(doc).inserted_id
-    doc["_id"] = str(_id); doc["threadId"] = str(doc["threadId"])
-    return jsonify(doc)
-
-@community_bp.post("/vote")
-@require_auth
-def vote():
-    p = request.get_json(force=True)
-    typ = p.get("type")
-    entity_id = p.get("entityId")
-    up = bool(p.get("up", True))
-    if typ not in ("thread","comment"): return jsonify({"error":"type must be thread|comment"}), 400
-    coll = threads if typ=="thread" else comments
-    oid = _oid(entity_id)
-
-    # fetch existing vote
-    v = votes.find_one({"userId": request.user_id, "type": typ, "entityId": str(oid)})
-    item = coll.find_one({"_id": oid}) or {}
-
-    def apply_counts(delta_up, delta_down):
-        coll.update_one({"_id": oid}, {"$inc": {"up": delta_up, "down": delta_down}})
-    # toggle logic
-    if v is None:
-        votes.insert_one({"userId": request.user_id, "type": typ, "entityId": str(oid), "up": up, "createdAt": utcnow()})
-        apply_counts(1 if up else 0, 0 if up else 1)
-    else:
-        if v["up"] == up:
-            # undo
-            votes.delete_one({"_id": v["_id"]})
-            apply_counts(-1 if up else 0, 0 if up else -1)
-        else:
-            # flip
-            votes.update_one({"_id": v["_id"]}, {"$set": {"up": up}})
-            apply_counts(+1 if up else -1, -1 if up else +1)
-
-    # recompute reliability for threads
-    t = coll.find_one({"_id": oid})
-    if typ == "thread" and t:
-        upv, dnv = int(t.get("up",0)), int(t.get("down",0))
-        rs = (upv - dnv) / max(1, (upv + dnv + 5))
-        threads.update_one({"_id": oid}, {"$set": {"reliabilityScore": float(rs)}})
-        t["reliabilityScore"] = rs
-    if t:
-        t["_id"] = str(t["_id"])
-        if t.get("threadId"): t["threadId"] = str(t["threadId"])
-    return jsonify(t or {"ok": True})
-
-@community_bp.get("/sentiment")
-def community_sentiment():
-    symbol = (request.args.get("symbol") or "").upper().strip()
-    if not symbol: return jsonify({"error":"symbol required"}), 400
-    cur = list(threads.find({"symbol": symbol}))
-    if not cur: return jsonify({"symbol": symbol, "score": 0.0, "method": "empty"})
-    cur.sort(key=lambda x: x.get("reliabilityScore", 0.0), reverse=True)
-    k = max(3, max(1, int(len(cur) * 0.1)))
-    top = cur[:k]
-    def v(s): return 1 if s=="buy" else (-1 if s=="sell" else 0)
-    score = sum(v(t.get("stance","neutral")) for t in top) / max(1, len(top))
-    return jsonify({"symbol": symbol, "score": float(score), "n": len(top), "method": "top10pct"})
+from flask import Blueprint, request, jsonify
+from bson import ObjectId
+from bson.errors import InvalidId
+from core import encoded, hotness, pagination, symbol_stats, voting
+from core.db import threads, comments, votes
+from core.auth import optional_user, require_auth
+from core.utils import utcnow
+from models.schemas import validate_thread, validate_comment
+
+community_bp = Blueprint("community", __name__, url_prefix="/api/community")
+
+def _oid(x): return ObjectId(x) if isinstance(x, str) else x
+
+# ---------- paging ----------
+THREAD_FIELDS = {"symbol", "title", "stance", "body", "createdBy", "createdAt", "up", "down",
+                 "reliabilityScore", "hotness", "commentCount"}
+# feed order -> index-backed keyset sort (see core/db.py)
+THREAD_SORTS = {
+    "new": [("createdAt", -1), ("_id", -1)],
+    "hot": [("hotness", -1), ("_id", -1)],
+    "top": [("reliabilityScore", -1), ("_id", 1)],
+}
+COMMENT_FIELDS = {"threadId", "body", "createdBy", "createdAt", "up", "down"}
+
+def _page_args(default_limit: int, max_limit: int, allowed: set):
+    """(limit, cursor, projection) from ?limit=&cursor=&fields=a,b; raises ValueError on bad input."""
+    limit = int(request.args.get("limit", default_limit))
+    if not 1 <= limit <= max_limit:
+        raise ValueError(f"limit must be 1..{max_limit}")
+    fields = [f.strip() for f in (request.args.get("fields") or "").split(",") if f.strip()]
+    unknown = set(fields) - allowed
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(sorted(unknown))}")
+    return limit, request.args.get("cursor") or None, ({f: 1 for f in fields} if fields else None)
+
+# Encoded list pages (core/encoded.py) are tagged with the shared "community"
+# version, which every thread/comment/vote write moves: a page is re-queried
+# and re-encoded only after something changed.
+def _cached_page(key: tuple, projection, build):
+    return encoded.cached(("community", *key, tuple(sorted(projection or ()))),
+                          encoded.version("community"), build)
+
+@community_bp.get("/threads")
+def list_threads():
+    """
+    Keyset-paged feed: ?symbol=&sort=new|hot|top&limit=50&cursor=<nextCursor>&fields=title,stance
+    new: newest first; hot: time-decayed votes + comments (core/hotness.py); top: reliabilityScore.
+    Response: { threads: [...], nextCursor: str | null }
+    """
+    symbol = (request.args.get("symbol") or "").upper().strip()
+    q = {"symbol": symbol} if symbol else {}
+    sort = THREAD_SORTS.get(request.args.get("sort") or "new")
+    if sort is None:
+        return jsonify({"error": f"sort must be {'|'.join(THREAD_SORTS)}"}), 400
+    def build():
+        docs, next_cursor = pagination.page(threads, q, sort, limit, cursor, projection)
+        items = []
+        for t in docs:
+            t["_id"] = str(t["_id"])
+            items.append(t)
+        return {"threads": items, "nextCursor": next_cursor}
+
+    try:
+        limit, cursor, projection = _page_args(50, 100, THREAD_FIELDS)
+        return encoded.respond(_cached_page(("threads", symbol, request.args.get("sort") or "new", limit, cursor),
+                                            projection, build))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@community_bp.post("/threads")
+@require_auth
+def create_thread():
+    data = validate_thread(request.get_json(force=True))
+    doc = {
+        **data,
+        "createdBy": request.user_id,
+        "createdAt": utcnow(),
+        "up": 0, "down": 0,
+        "reliabilityScore": 0.0,
+        "commentCount": 0,
+    }
+    doc["hotness"] = hotness.score(0, 0, 0, doc["createdAt"])
+    _id = threads.insert_one(doc).inserted_id
+    symbol_stats.thread_added(doc)
+    encoded.bump("community")
+    doc["_id"] = str(_id)
+    return jsonify(doc)
+
+@community_bp.get("/threads/<tid>/full")
+def thread_full(tid):
+    """
+    Thread detail in one aggregation: the thread, its first page of comments
+    (oldest first, same cursor as /comments), the comment count, and the
+    caller's own votes on the thread and those comments when signed in.
+    Response: { thread, comments: [...], commentCount, nextCursor, myVotes: {entityId: up} }
+    """
+    try:
+        oid = ObjectId(tid)
+        limit = int(request.args.get("limit", 50))
+    except (InvalidId, TypeError, ValueError):
+        return jsonify({"error": "invalid thread id or limit"}), 400
+    if not 1 <= limit <= 200:
+        return jsonify({"error": "limit must be 1..200"}), 400
+    tid, uid = str(oid), optional_user()
+
+    pipeline = [
+        {"$match": {"_id": oid}},
+        # (threadId, createdAt, _id) index: first page, plus one to know if there's more
+        {"$lookup": {"from": comments.name, "localField": "_id", "foreignField": "threadId",
+                     "pipeline": [{"$sort": {"createdAt": 1, "_id": 1}}, {"$limit": limit + 1}],
+                     "as": "comments"}},
+        {"$lookup": {"from": comments.name, "localField": "_id", "foreignField": "threadId",
+                     "pipeline": [{"$count": "n"}], "as": "commentCount"}},
+    ]
+    if uid:
+        # votes are keyed by (userId, type, entityId): one unique-index probe per entity
+        pipeline += [
+            {"$set": {"_entityIds": {"$concatArrays": [
+                [tid],
+                {"$map": {"input": {"$slice": ["$comments", limit]}, "in": {"$toString": "$$this._id"}}},
+            ]}}},
+            {"$lookup": {"from": votes.name, "localField": "_entityIds", "foreignField": "entityId",
+                         "pipeline": [{"$match": {"userId": uid, "up": {"$ne": None}}},
+                                      {"$project": {"_id": 0, "type": 1, "entityId": 1, "up": 1}}],
+                         "as": "myVotes"}},
+        ]
+    t = next(threads.aggregate(pipeline), None)
+    if t is None:
+        return jsonify({"error": "not found"}), 404
+
+    cm = t.pop("comments")
+    next_cursor = pagination.encode([cm[limit - 1]["createdAt"], cm[limit - 1]["_id"]]) if len(cm) > limit else None
+    cm = cm[:limit]
+    for c in cm:
+        c["_id"] = str(c["_id"]); c["threadId"] = str(c["threadId"])
+    count = t.pop("commentCount")
+    my_votes = {v["entityId"]: v["up"] for v in t.pop("myVotes", [])
+                if v["type"] == ("thread" if v["entityId"] == tid else "comment")}
+    t.pop("_entityIds", None)
+    t["_id"] = str(t["_id"])
+    return jsonify({"thread": t, "comments": cm, "commentCount": count[0]["n"] if count else 0,
+                    "nextCursor": next_cursor, "myVotes": my_votes})
+
+@community_bp.get("/comments")
+def list_comments():
+    """
+    Oldest first, keyset-paged: ?threadId=&limit=200&cursor=<nextCursor>&fields=body
+    Response: { comments: [...], nextCursor: str | null }
+    """
+    tid = request.args.get("threadId")
+    if not tid: return jsonify({"error":"threadId required"}), 400
+    def build():
+        docs, next_cursor = pagination.page(comments, {"threadId": _oid(tid)}, [("createdAt", 1), ("_id", 1)],
+                                            limit, cursor, projection)
+        items = []
+        for c in docs:
+            c["_id"] = str(c["_id"])
+            if "threadId" in c: c["threadId"] = str(c["threadId"])
+            items.append(c)
+        return {"comments": items, "nextCursor": next_cursor}
+
+    try:
+        limit, cursor, projection = _page_args(200, 200, COMMENT_FIELDS)
+        return encoded.respond(_cached_page(("comments", tid, limit, cursor), projection, build))
+    except (ValueError, InvalidId) as e:
+        return jsonify({"error": str(e)}), 400
+
+@community_bp.post("/comments")
+@require_auth
+def add_comment():
+    data = validate_comment(request.get_json(force=True))
+    doc = {
+        **data,
+        "threadId": _oid(data["threadId"]),
+        "createdBy": request.user_id,
+        "createdAt": utcnow(),
+        "up": 0, "down": 0,
+    }
+    _id = comments.insert_one(doc).inserted_id
+    threads.update_one({"_id": doc["threadId"]}, [
+        {"$set": {"commentCount": {"$add": [{"$ifNull": ["$commentCount", 0]}, 1]}}},
+        {"$set": {"hotness": hotness.expr()}},
+    ])
+    encoded.bump("community")
+    doc["_id"] = str(_id); doc["threadId"] = str(doc["threadId"])
+    return jsonify(doc)
+
+@community_bp.post("/vote")
+@require_auth
+def vote():
+    p = request.get_json(force=True)
+    typ = p.get("type")
+    entity_id = p.get("entityId")
+    up = bool(p.get("up", True))
+    if typ not in ("thread","comment"): return jsonify({"error":"type must be thread|comment"}), 400
+    oid = _oid(entity_id)
+
+    # vote state, then counters + reliability: one atomic write each (core/voting.py)
+    prev, now = voting.cast(request.user_id, typ, str(oid), up)
+    t = voting.apply(typ, oid, *voting.deltas(prev, now))
+    if t:
+        t["_id"] = str(t["_id"])
+        if t.get("threadId"): t["threadId"] = str(t["threadId"])
+    return jsonify(t or {"ok": True})
+
+@community_bp.get("/sentiment")
+def community_sentiment():
+    symbol = (request.args.get("symbol") or "").upper().strip()
+    if not symbol: return jsonify({"error":"symbol required"}), 400
+    stats = symbol_stats.get(symbol)
+    if not stats["n"]: return jsonify({"symbol": symbol, "score": 0.0, "method": "empty"})
+    return jsonify({"symbol": symbol, "score": stats["score"], "n": stats["k"], "method": "top10pct"})
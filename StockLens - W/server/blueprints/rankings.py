@@ -1,33 +1,235 @@
-from flask import Blueprint, request, jsonify
-from services import finnhub, newsapi, sentiment as sent
-from services.ranking_model import compute_features, rank_with_explain
-from core.db import threads
-
-rank_bp = Blueprint("rankings", __name__, url_prefix="/api/rankings")
-
-
-def _community_score(symbol: str):
-    cur = list(threads.find({"symbol": symbol}))
-    if not cur:
-        return 0.0
-    cur.sort(key=lambda x: x.get("reliabilityScore", 0.0), reverse=True)
-    k = max(3, max(1, int(len(cur) * 0.1)))
-    top = cur[:k]
-    def val(s):
-        return 1 if s == "buy" else (-1 if s == "sell" else 0)
-    return sum(val(t.get("stance", "neutral")) for t in top) / max(1, len(top))
-
-
-@rank_bp.get("/one")
-def one():
-    symbol = (request.args.get("symbol") or "").upper().strip()
-    if not symbol:
-        return jsonify({"error": "symbol required"}), 400
-    q = finnhub.quote(symbol)
-    headlines = newsapi.headlines_for_symbol(symbol, page_size=8)
-    news_s = sent.headline_sentiment(headlines)
-    comm_s = _community_score(symbol)
-    features = compute_features(q, community_score=comm_s, news_sentiment=news_s)
-    result = rank_with_explain(features)
-    result.update({"symbol": symbol, "newsSentiment": news_s, "communityScore": comm_s})
-    return jsonify(result)
\ No newline at end of file
+import asyncio, math, os, time
+import numpy as np
+from flask import Blueprint, request, jsonify
+from services import aio, finnhub, news as news_service, sentiment as sent
+from services.ranking_model import FEATURES, compute_features, rank_batch, rank_with_explain
+from core import ratelimit, scheduler, symbol_stats
+from core.ratelimit import RateLimited
+from core.cache import LRUCache
+from core.db import threads
+
+rank_bp = Blueprint("rankings", __name__, url_prefix="/api/rankings")
+
+# ---------- config ----------
+RANK_BATCH_MAX = int(os.getenv("RANK_BATCH_MAX", "500"))            # symbols per batch / leaderboard
+RANK_TOP_K = int(os.getenv("RANK_TOP_K", "25"))
+RANK_QUOTE_TTL = int(os.getenv("RANK_QUOTE_TTL", "60"))
+RANK_NEWS_TTL = int(os.getenv("RANK_NEWS_TTL", "3600"))
+RANK_QUOTE_FETCH_MAX = int(os.getenv("RANK_QUOTE_FETCH_MAX", "20"))  # inline quote misses per request
+RANK_NEWS_FETCH_MAX = int(os.getenv("RANK_NEWS_FETCH_MAX", "10"))    # inline NewsAPI calls per request
+RANK_BOARD_TTL = int(os.getenv("RANK_BOARD_TTL", "60"))
+RANK_DECAY_INTERVAL = int(os.getenv("RANK_DECAY_INTERVAL", "3600"))  # seconds between lookup-count halvings
+RANK_UNIVERSE = [s.strip().upper() for s in os.getenv("RANK_UNIVERSE", "").split(",") if s.strip()]
+
+# ("dp", symbol) -> quote % change, ("news", symbol) -> headline sentiment,
+# ("board",) -> ranked leaderboard rows
+_INPUTS = LRUCache("rankings", int(float(os.getenv("CACHE_RANKINGS_MB", "4")) * 1024 * 1024),
+                   stale_ttl=int(os.getenv("RANK_STALE_TTL", "3600")))
+
+# ---------- community ----------
+def _community_scores(symbols: list) -> np.ndarray:
+    stats = symbol_stats.get_many(symbols)
+    return np.array([stats[s]["score"] for s in symbols])
+
+
+def _community_score(symbol: str):
+    return symbol_stats.get(symbol)["score"]
+
+
+# ---------- inputs ----------
+def _store_dp(symbol: str, q: dict) -> float:
+    # no price is Finnhub's answer for a symbol it doesn't know: cached as a missing quote (NaN)
+    q = q or {}
+    dp = float(q.get("dp") or 0.0) if q.get("c") else np.nan
+    _INPUTS.set(("dp", symbol), dp, ttl=RANK_QUOTE_TTL)
+    return dp
+
+
+def _store_news(by_symbol: dict) -> dict:
+    # every symbol's headlines go through the sentiment engine as one batch
+    scores = sent.batch_sentiment(by_symbol)
+    for symbol, s in scores.items():
+        _INPUTS.set(("news", symbol), s, ttl=RANK_NEWS_TTL)
+    return scores
+
+
+async def _adp(symbol: str, priority) -> float:
+    return _store_dp(symbol, await finnhub.aquote(symbol, priority))
+
+
+def _refresh_dp(symbol: str):
+    scheduler.submit(("rank-dp", symbol),
+                     lambda: _store_dp(symbol, finnhub.quote(symbol, ratelimit.BACKGROUND)))
+
+
+def _cached(kind: str, symbols: list):
+    vals, misses, stale = {}, [], []
+    for s in symbols:
+        v, fresh = _INPUTS.lookup((kind, s))
+        if v is None:
+            misses.append(s)
+            continue
+        vals[s] = v
+        if not fresh:
+            stale.append(s)
+    return vals, misses, stale
+
+
+def _gather_inputs(symbols: list, priority):
+    """Quote % change and news sentiment per symbol, as arrays.
+
+    Cached values are used as-is. A bounded number of misses are fetched
+    concurrently on the worker's event loop so a large universe can't drain
+    the Finnhub bucket or the NewsAPI quota; remaining and stale quotes are
+    refilled by the background scheduler. Unknown inputs rank as neutral.
+    """
+    dp, dp_miss, dp_stale = _cached("dp", symbols)
+    news, news_miss, _ = _cached("news", symbols)
+    fetch_dp, fetch_news = dp_miss[:RANK_QUOTE_FETCH_MAX], news_miss[:RANK_NEWS_FETCH_MAX]
+    coros = ([_adp(s, priority) for s in fetch_dp]
+             + [news_service.aarticles(s, 8, priority) for s in fetch_news])
+    results = aio.gather(*coros, return_exceptions=True) if coros else []
+    n = len(fetch_dp)
+    ok = lambda fetched, got: {s: r for s, r in zip(fetched, got) if not isinstance(r, BaseException)}
+    dp.update(ok(fetch_dp, results[:n]))
+    news.update(_store_news(ok(fetch_news, results[n:])))
+    for s in dp_stale + [s for s in dp_miss if s not in dp]:
+        _refresh_dp(s)
+    missing = {"quote": [s for s in symbols if np.isnan(dp.get(s, np.nan))],
+               "news": [s for s in symbols if s not in news]}
+    return (np.array([dp.get(s, np.nan) for s in symbols]),
+            np.array([news.get(s, 0.0) for s in symbols]), missing)
+
+
+# ---------- ranking ----------
+def _rank(symbols: list, priority=ratelimit.INTERACTIVE) -> dict:
+    """Score every symbol at once and return rows sorted best first."""
+    dp, news, missing = _gather_inputs(symbols, priority)
+    comm = _community_scores(symbols)
+    features, contributions, scores, labels = rank_batch(dp, comm, news)
+    rows = []
+    for rank, i in enumerate(np.argsort(-scores, kind="stable"), 1):
+        rows.append({
+            "rank": rank,
+            "symbol": symbols[i],
+            "score": round(float(scores[i]), 4),
+            "label": str(labels[i]),
+            "features": {k: round(float(features[i, j]), 4) for j, k in enumerate(FEATURES)},
+            "contributions": {k: round(float(contributions[i, j]), 4) for j, k in enumerate(FEATURES)},
+            "newsSentiment": float(news[i]),
+            "communityScore": round(float(comm[i]), 4),
+        })
+    return {"ranked": rows, "missing": missing}
+
+
+def _universe() -> list:
+    # configured symbols, then every symbol with community threads, then recent lookups
+    symbols = RANK_UNIVERSE + threads.distinct("symbol") + scheduler.popular("rankings", RANK_BATCH_MAX)
+    return list(dict.fromkeys(s.upper() for s in symbols if s))[:RANK_BATCH_MAX]
+
+
+_last_decay = time.time()
+
+
+def _build_board(priority=ratelimit.BACKGROUND) -> dict:
+    global _last_decay
+    board = _rank(_universe(), priority)
+    if time.time() - _last_decay >= RANK_DECAY_INTERVAL:
+        _last_decay = time.time()
+        scheduler.decay("rankings")  # symbols stop counting as recent lookups once traffic moves on
+    _INPUTS.set(("board",), board, ttl=RANK_BOARD_TTL)
+    return board
+
+
+def _limit_arg():
+    try:
+        return max(1, min(RANK_BATCH_MAX, int(request.args.get("limit", RANK_TOP_K))))
+    except ValueError:
+        return None
+
+
+@rank_bp.get("/one")
+def one():
+    symbol = (request.args.get("symbol") or "").upper().strip()
+    if not symbol:
+        return jsonify({"error": "symbol required"}), 400
+    # quote, headlines and the community scan are independent: run them concurrently
+    q, headlines, comm_s = aio.gather(
+        finnhub.aquote(symbol),
+        news_service.aarticles(symbol, 8),
+        asyncio.to_thread(_community_score, symbol),
+        return_exceptions=True,
+    )
+    # the quote is what a single ranking can't do without; the rest rank as neutral
+    if isinstance(q, RateLimited):
+        resp = jsonify({"error": str(q), "retryAfterMs": q.wait_ms})
+        resp.headers["Retry-After"] = str(max(1, math.ceil(q.wait_ms / 1000)))
+        return resp, 429
+    if isinstance(q, BaseException):
+        return jsonify({"error": f"quote unavailable: {q}"}), 502
+    missing = []
+    if isinstance(headlines, BaseException):
+        headlines = None
+        missing.append("news")
+    if isinstance(comm_s, BaseException):
+        comm_s = 0.0
+        missing.append("community")
+    if not np.isnan(_store_dp(symbol, q)):
+        scheduler.touch("rankings", symbol)  # only real symbols join the leaderboard universe
+    news_s = _store_news({symbol: headlines})[symbol] if headlines is not None else 0.0
+    features = compute_features(q, community_score=comm_s, news_sentiment=news_s)
+    result = rank_with_explain(features)
+    result.update({"symbol": symbol, "newsSentiment": news_s, "communityScore": comm_s, "missing": missing})
+    return jsonify(result)
+
+
+@rank_bp.route("/batch", methods=["GET", "POST"])
+def batch():
+    """
+    Rank many symbols in one call:
+      GET  /api/rankings/batch?symbols=AAPL,MSFT,...&limit=25
+      POST /api/rankings/batch  {"symbols": ["AAPL", "MSFT", ...]}
+    Response: { ok, count, ranked: [top `limit` rows, best first], missing: {quote: [...], news: [...]} }
+    Symbols under `missing` were scored with that input neutral.
+    """
+    if request.method == "POST":
+        raw = (request.get_json(silent=True) or {}).get("symbols") or []
+    else:
+        raw = (request.args.get("symbols") or "").split(",")
+    symbols = list(dict.fromkeys(str(s).strip().upper() for s in raw if str(s).strip()))
+    if not symbols:
+        return jsonify({"error": "symbols required"}), 400
+    if len(symbols) > RANK_BATCH_MAX:
+        return jsonify({"error": f"at most {RANK_BATCH_MAX} symbols per request"}), 400
+    limit = _limit_arg()
+    if limit is None:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    result = _rank(symbols)
+    # only symbols that resolved to a real quote join the leaderboard universe
+    unknown = set(result["missing"]["quote"])
+    for s in symbols:
+        if s not in unknown:
+            scheduler.touch("rankings", s)
+    return jsonify({"ok": True, "count": len(symbols), "ranked": result["ranked"][:limit],
+                    "missing": result["missing"]})
+
+
+@rank_bp.get("/leaderboard")
+def leaderboard():
+    """
+    Top-ranked symbols across the universe (RANK_UNIVERSE, symbols with
+    community threads, recently ranked symbols): /api/rankings/leaderboard?limit=25
+    The ranked universe is cached for RANK_BOARD_TTL and rebuilt in the background.
+    """
+    limit = _limit_arg()
+    if limit is None:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    board, fresh = _INPUTS.lookup(("board",))
+    if board is None:
+        board = _build_board(ratelimit.INTERACTIVE)
+    elif not fresh:
+        scheduler.submit(("rankings", "board"), _build_board)
+    return jsonify({"ok": True, "count": len(board["ranked"]), "ranked": board["ranked"][:limit],
+                    "missing": board["missing"]})
@@ -1,524 +1,608 @@
-# server/blueprints/stocks.py
-from flask import Blueprint, request, jsonify
-import os, time, math, random, requests
-from time import monotonic, sleep
-from tenacity import retry, stop_after_attempt, wait_fixed, RetryError
-from datetime import datetime, timedelta, timezone
-try:
-    from zoneinfo import ZoneInfo  # py3.9+
-except Exception:
-    ZoneInfo = None
-
-stocks_bp = Blueprint("stocks", __name__, url_prefix="/api/stocks")
-
-
-# ---------- config ----------
-FINNHUB_KEY = os.environ.get("FINNHUB_KEY", "").strip()
-BASE = "https://finnhub.io/api/v1"
-DEMO_MODE = os.getenv("DEMO_MODE", "0") not in ("0", "", "false", "False")
-
-# cushion against 429 from provider
-_FINN_MIN_GAP = float(os.getenv("FINN_MIN_GAP", "0.40"))  # seconds
-_last_call = 0.0
-def _throttle():
-    global _last_call
-    now = monotonic()
-    gap = _FINN_MIN_GAP - (now - _last_call)
-    if gap > 0:
-        sleep(gap)
-    _last_call = monotonic()
-
-
-# --- NewsAPI integration ---
-NEWSAPI_KEY = os.environ.get("NEWSAPI_KEY", "").strip()
-
-# very small in-memory cache for news: key -> (expires_ts, payload)
-_NEWS_CACHE = {}
-
-def _news_cache_get(key):
-    row = _NEWS_CACHE.get(key)
-    if not row:
-        return None
-    exp, payload = row
-    if exp > time.time():
-        return payload
-    _NEWS_CACHE.pop(key, None)
-    return None
-
-def _news_cache_set(key, payload, ttl=900):  # 15 minutes
-    _NEWS_CACHE[key] = (time.time() + ttl, payload)
-
-
-# ---------- small in-memory cache (valid_until) ----------
-# key: (symbol, resolution, count) -> {"valid_until": ts, "payload": dict}
-_CANDLE_CACHE: dict = {}
-
-def _cache_get(key):
-    row = _CANDLE_CACHE.get(key)
-    if not row:
-        return None
-    if row.get("valid_until", 0) > time.time():
-        return row["payload"]
-    _CANDLE_CACHE.pop(key, None)
-    return None
-
-def _cache_set_until(key, payload, valid_until_ts: int):
-    _CANDLE_CACHE[key] = {"valid_until": int(valid_until_ts), "payload": payload}
-
-def _cache_set_ttl(key, payload, ttl_seconds: int):
-    _cache_set_until(key, payload, int(time.time()) + int(ttl_seconds))
-
-# ---------- utils ----------
-def _key_ok() -> bool:
-    return bool(FINNHUB_KEY)
-
-def _err(status: int, msg: str):
-    return jsonify({"ok": False, "error": msg}), status
-
-def _demo_series(n=120, base=100.0):
-    vals, v = [], float(base or 100)
-    for i in range(n):
-        v += math.sin(i/7.0)*0.6 + (random.random()-0.5)*0.8
-        v = max(v, 1.0)
-        vals.append(round(v, 2))
-    return vals
-
-@retry(stop=stop_after_attempt(2), wait=wait_fixed(0.3))
-def _get(path, params):
-    params = dict(params or {})
-    params["token"] = FINNHUB_KEY
-    _throttle()
-    r = requests.get(f"{BASE}{path}", params=params, timeout=8)
-    if r.status_code != 200:
-        body = (r.text or "").strip()
-        raise requests.HTTPError(f"{r.status_code} {body[:300]}", response=r, request=r.request)
-    return r.json()
-
-def _demo_candles(symbol: str, count: int, resolution: str):
-    c = _demo_series(count, 100.0)
-    t = list(range(len(c)))
-    return {
-        "ok": True, "symbol": symbol, "s": "ok",
-        "t": t, "c": c, "o": [], "h": [], "l": [],
-        "meta": {"source": "demo", "resolution": resolution, "from": 0, "to": len(t), "count": len(t)}
-    }
-
-# ---------- refresh policy (override with env if you want) ----------
-# Intraday (60) short TTL; D/W/M cache until next close by default.
-CANDLE_60_TTL = int(os.getenv("CANDLE_60_TTL", "1800"))   # 30 min
-CANDLE_D_TTL  = int(os.getenv("CANDLE_D_TTL",  "0"))      # 0 => next close
-CANDLE_W_TTL  = int(os.getenv("CANDLE_W_TTL",  "0"))
-CANDLE_M_TTL  = int(os.getenv("CANDLE_M_TTL",  "0"))
-
-def _next_nyse_close_ts(now_utc: datetime | None = None) -> int:
-    """Return UNIX ts for next 4:00 PM America/New_York (with a 10-min buffer)."""
-    if now_utc is None:
-        now_utc = datetime.now(timezone.utc)
-    if ZoneInfo is None:
-        next_midnight = (now_utc + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
-        return int(next_midnight.timestamp())
-
-    ny = now_utc.astimezone(ZoneInfo("America/New_York"))
-    close = ny.replace(hour=16, minute=0, second=0, microsecond=0)
-    if ny >= close:
-        close += timedelta(days=1)
-    close = close + timedelta(minutes=10)
-    return int(close.astimezone(timezone.utc).timestamp())
-
-def _ttl_for(resolution: str) -> int | None:
-    """Return TTL seconds for a resolution or None to use next-close logic."""
-    if resolution == "60":
-        return CANDLE_60_TTL
-    if resolution == "D":
-        return None if CANDLE_D_TTL == 0 else CANDLE_D_TTL
-    if resolution == "W":
-        return None if CANDLE_W_TTL == 0 else CANDLE_W_TTL
-    if resolution == "M":
-        return None if CANDLE_M_TTL == 0 else CANDLE_M_TTL
-    return CANDLE_D_TTL or None
-
-# ---------- Yahoo fallback (no key required) ----------
-def _get_yahoo_candles(symbol: str, resolution: str, count: int):
-    """
-    Fetch candles from Yahoo Finance and map to our standard payload.
-    """
-    if resolution == "60":
-        rng, interval = "5d", "60m"
-    elif resolution == "W":
-        rng, interval = "2y", "1wk"
-    elif resolution == "M":
-        rng, interval = "5y", "1mo"
-    else:
-        rng, interval = "6mo", "1d"
-
-    url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
-    params = {
-        "range": rng,
-        "interval": interval,
-        "includePrePost": "false",
-        "events": "div,splits",
-    }
-    r = requests.get(url, params=params, timeout=10)
-    if r.status_code != 200:
-        raise requests.HTTPError(f"yahoo {r.status_code}: {r.text[:300]}")
-
-    data = r.json()
-    result = (data or {}).get("chart", {}).get("result", [])
-    if not result:
-        return {
-            "ok": True, "symbol": symbol, "s": "no_data",
-            "t": [], "c": [], "o": [], "h": [], "l": [],
-            "meta": {"source": "yahoo", "resolution": resolution, "range": rng, "interval": interval, "count": 0}
-        }
-
-    res0 = result[0]
-    ts = res0.get("timestamp") or []
-    quote = (res0.get("indicators", {}).get("quote") or [{}])[0]
-    c = quote.get("close") or []
-    o = quote.get("open") or []
-    h = quote.get("high") or []
-    l = quote.get("low") or []
-
-    n = min(len(ts), len(c), len(o), len(h), len(l))
-    ts, c, o, h, l = ts[:n], c[:n], o[:n], h[:n], l[:n]
-
-    if count and n > count:
-        ts = ts[-count:]; c = c[-count:]; o = o[-count:]; h = h[-count:]; l = l[-count:]
-        n = count
-
-    return {
-        "ok": True,
-        "symbol": symbol,
-        "s": "ok" if n else "no_data",
-        "t": ts, "c": c, "o": o, "h": h, "l": l,
-        "meta": {"source": "yahoo", "resolution": resolution, "range": rng, "interval": interval, "count": n},
-    }
-
-# ---------- QUOTE ----------
-@stocks_bp.get("/quote")
-def quote():
-    symbol = (request.args.get("symbol") or "").upper()
-    if not symbol:
-        return _err(400, "symbol required")
-
-    if not _key_ok() and DEMO_MODE:
-        return jsonify({
-            "ok": True, "c": 258.06, "d": 1.58, "dp": 0.616,
-            "h": 258.52, "l": 256.11, "o": 256.52, "pc": 256.48, "t": int(time.time())
-        })
-    if not _key_ok():
-        return _err(400, "FINNHUB_KEY missing")
-
-    try:
-        data = _get("/quote", {"symbol": symbol})
-        return jsonify({"ok": True, **(data or {})})
-    except (requests.HTTPError, requests.RequestException, RetryError) as e:
-        if DEMO_MODE:
-            return jsonify({
-                "ok": True, "c": 258.06, "d": 1.58, "dp": 0.616,
-                "h": 258.52, "l": 256.11, "o": 256.52, "pc": 256.48, "t": int(time.time())
-            })
-        code = getattr(getattr(e, "response", None), "status_code", 502) or 502
-        return _err(code, f"finnhub: {e}")
-    
-# ---------- Yahoo ----------
-    
-def _get_yahoo_candles(symbol: str, resolution: str, count: int) -> dict:
-    """
-    Fetch candles from Yahoo Finance (no API key).
-    Returns our standard payload shape.
-    """
-    # Choose a simple range/interval based on resolution
-    if resolution == "60":
-        rng, interval = "5d", "60m"
-    elif resolution == "W":
-        rng, interval = "2y", "1wk"
-    elif resolution == "M":
-        rng, interval = "5y", "1mo"
-    else:
-        rng, interval = "6mo", "1d"   # default to daily
-
-    url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
-    params = {
-        "range": rng,
-        "interval": interval,
-        "includePrePost": "false",
-        "events": "div,splits",
-    }
-    r = requests.get(
-        url,
-        params=params,
-        timeout=10,
-        headers={"User-Agent": "Mozilla/5.0"}  # some proxies require UA
-    )
-    if r.status_code != 200:
-        raise requests.HTTPError(f"yahoo {r.status_code}: {r.text[:200]}")
-
-    data = r.json()
-    result = (data or {}).get("chart", {}).get("result", [])
-    if not result:
-        return {
-            "ok": True, "symbol": symbol, "s": "no_data",
-            "t": [], "c": [], "o": [], "h": [], "l": [],
-            "meta": {"source": "yahoo", "resolution": resolution,
-                     "range": rng, "interval": interval, "count": 0}
-        }
-
-    res0 = result[0]
-    ts = res0.get("timestamp") or []
-    quote = (res0.get("indicators", {}).get("quote") or [{}])[0]
-    c = quote.get("close") or []
-    o = quote.get("open") or []
-    h = quote.get("high") or []
-    l = quote.get("low") or []
-
-    n = min(len(ts), len(c), len(o), len(h), len(l))
-    ts, c, o, h, l = ts[:n], c[:n], o[:n], h[:n], l[:n]
-
-    if count and n > count:
-        ts, c, o, h, l = ts[-count:], c[-count:], o[-count:], h[-count:], l[-count:]
-        n = count
-
-    return {
-        "ok": True, "symbol": symbol, "s": "ok" if n else "no_data",
-        "t": ts, "c": c, "o": o, "h": h, "l": l,
-        "meta": {"source": "yahoo", "resolution": resolution,
-                 "range": rng, "interval": interval, "count": n}
-    }
-
-
-# ---------- CANDLES ----------
-@stocks_bp.get("/candles")
-def candles():
-    symbol = (request.args.get("symbol") or "").upper()
-    if not symbol:
-        return _err(400, "symbol required")
-
-    resolution = (request.args.get("resolution") or "D").upper()
-    try:
-        count = int(request.args.get("count") or 90)
-    except Exception:
-        count = 90
-
-    key = (symbol, resolution, count)
-    cached = _cache_get(key)
-    if cached:
-        return jsonify(cached)
-
-    # If no Finnhub key, we still want data: use Yahoo (or demo if DEMO_MODE)
-    if not _key_ok():
-        try:
-            shaped = _get_yahoo_candles(symbol, resolution, count)
-            ttl = _ttl_for(resolution)
-            if ttl is None:
-                _cache_set_until(key, shaped, _next_nyse_close_ts())
-            else:
-                _cache_set_ttl(key, shaped, ttl)
-            return jsonify(shaped)
-        except Exception as e:
-            if DEMO_MODE:
-                shaped = _demo_candles(symbol, count, resolution)
-                ttl = _ttl_for(resolution)
-                if ttl is None:
-                    _cache_set_until(key, shaped, _next_nyse_close_ts())
-                else:
-                    _cache_set_ttl(key, shaped, ttl)
-                return jsonify(shaped)
-            return _err(502, f"candles: {e}")
-
-    # Try Finnhub first
-    now = int(time.time())
-    span = {"D": 86400, "W": 604800, "M": 2592000, "60": 60}.get(resolution, 86400)
-    _from = now - span * count
-
-    try:
-        raw = _get("/stock/candle", {
-            "symbol": symbol, "resolution": resolution, "from": _from, "to": now
-        })
-        if raw.get("s") == "ok":
-            shaped = {
-                "ok": True, "symbol": symbol, "s": "ok",
-                "t": raw.get("t", []), "c": raw.get("c", []),
-                "o": raw.get("o", []), "h": raw.get("h", []), "l": raw.get("l", []),
-                "meta": {"source": "finnhub", "resolution": resolution,
-                         "from": _from, "to": now, "count": len(raw.get("t", []))}
-            }
-        else:
-            raise RuntimeError(f"finnhub returned s={raw.get('s')}")
-    except Exception as finnhub_err:
-        # Finnhub failed or no data -> fallback to Yahoo
-        try:
-            shaped = _get_yahoo_candles(symbol, resolution, count)
-        except Exception as yahoo_err:
-            if DEMO_MODE:
-                shaped = _demo_candles(symbol, count, resolution)
-            else:
-                return _err(502, f"finnhub: {finnhub_err} | yahoo: {yahoo_err}")
-
-    # Cache according to policy and return
-    ttl = _ttl_for(resolution)
-    if ttl is None:
-        _cache_set_until(key, shaped, _next_nyse_close_ts())
-    else:
-        _cache_set_ttl(key, shaped, ttl)
-
-    return jsonify(shaped)
-
-def _company_terms_for_news(symbol: str) -> str:
-    """
-    Build a search query string for NewsAPI.
-    We try to include the company name (from profile if we can),
-    otherwise fall back to the symbol alone.
-    """
-    name = None
-    try:
-        if _key_ok():
-            prof = _get("/stock/profile2", {"symbol": symbol})
-            name = (prof or {}).get("name")
-    except Exception:
-        name = None
-
-    if name:
-        # Favor company name but include ticker to keep it on-topic
-        # Keep it simple to avoid NewsAPI max query length issues.
-        return f"\"{name}\" OR {symbol}"
-    return symbol
-
-
-
-# ---------- PROFILE ----------
-@stocks_bp.get("/profile")
-def profile():
-    symbol = (request.args.get("symbol") or "").upper()
-    if not symbol:
-        return _err(400, "symbol required")
-
-    if not _key_ok() and DEMO_MODE:
-        return jsonify({"ok": True, "ticker": symbol or "AAPL", "name": "Demo Inc", "exchange": "DEMO", "currency": "USD"})
-    if not _key_ok():
-        return _err(400, "FINNHUB_KEY missing")
-
-    try:
-        data = _get("/stock/profile2", {"symbol": symbol})
-        return jsonify({"ok": True, **(data or {})})
-    except (requests.HTTPError, requests.RequestException, RetryError) as e:
-        if DEMO_MODE:
-            return jsonify({"ok": True, "ticker": symbol, "name": "Demo Inc", "exchange": "DEMO", "currency": "USD"})
-        code = getattr(getattr(e, "response", None), "status_code", 502) or 502
-        return _err(code, f"finnhub: {e}")
-
-# ---------- METRICS ----------
-@stocks_bp.get("/metrics")
-def metrics():
-    symbol = (request.args.get("symbol") or "").upper()
-    if not symbol:
-        return _err(400, "symbol required")
-
-    if not _key_ok() and DEMO_MODE:
-        return jsonify({"ok": True, "metric": {"marketCapitalization": 0.0, "peBasicExclExtraTTM": 38.5}})
-    if not _key_ok():
-        return _err(400, "FINNHUB_KEY missing")
-
-    try:
-        data = _get("/stock/metric", {"symbol": symbol, "metric": "all"})
-        return jsonify({"ok": True, **(data or {})})
-    except (requests.HTTPError, requests.RequestException, RetryError) as e:
-        if DEMO_MODE:
-            return jsonify({"ok": True, "metric": {"marketCapitalization": 0.0, "peBasicExclExtraTTM": 38.5}})
-        code = getattr(getattr(e, "response", None), "status_code", 502) or 502
-        return _err(code, f"finnhub: {e}")
-
-
-@stocks_bp.get("/news")
-def stock_news():
-    """
-    Return latest news articles for a symbol using NewsAPI.org.
-    Response:
-      { ok: true, articles: [{title, url, source, publishedAt, image, description}] }
-    """
-    symbol = (request.args.get("symbol") or "").upper()
-    if not symbol:
-        return _err(400, "symbol required")
-
-    try:
-        limit = max(1, min(int(request.args.get("limit", 8)), 30))
-    except Exception:
-        limit = 8
-
-    # Serve from cache if available
-    key = (symbol, limit)
-    cached = _news_cache_get(key)
-    if cached:
-        return jsonify(cached)
-
-    if not NEWSAPI_KEY:
-        # No key: don't 500 the page, just return empty
-        payload = {"ok": True, "articles": []}
-        _news_cache_set(key, payload, ttl=300)
-        return jsonify(payload)
-
-    # Build a tight query to reduce irrelevant items
-    query = _company_terms_for_news(symbol)
-    # last 14 days max, in ISO
-    to_date = datetime.now(timezone.utc)
-    from_date = to_date - timedelta(days=14)
-
-    url = "https://newsapi.org/v2/everything"
-    params = {
-        "q": query,
-        "language": "en",
-        "sortBy": "publishedAt",
-        "pageSize": limit,
-        "from": from_date.isoformat(timespec="seconds").replace("+00:00", "Z"),
-        "to": to_date.isoformat(timespec="seconds").replace("+00:00", "Z"),
-        "apiKey": NEWSAPI_KEY,
-    }
-
-    try:
-        r = requests.get(url, params=params, timeout=10)
-        if r.status_code != 200:
-            raise requests.HTTPError(f"{r.status_code} {r.text[:300]}")
-        data = r.json() or {}
-        raw = data.get("articles") or []
-
-        articles = []
-        for a in raw:
-            # Normalize fields; fallback gracefully if keys are missing
-            title = a.get("title") or ""
-            url_ = a.get("url") or ""
-            src = ((a.get("source") or {}).get("name") or "").strip()
-            published = a.get("publishedAt") or ""
-            # Convert ISO date to epoch seconds for easy rendering client-side
-            try:
-                dt = datetime.fromisoformat(published.replace("Z", "+00:00"))
-                ts = int(dt.timestamp())
-            except Exception:
-                ts = int(time.time())
-            image = a.get("urlToImage") or ""
-            desc = (a.get("description") or a.get("content") or "").strip()
-
-            if title and url_:
-                articles.append({
-                    "title": title,
-                    "url": url_,
-                    "source": src,
-                    "publishedAt": ts,
-                    "image": image,
-                    "description": desc,
-                })
-
-        payload = {"ok": True, "articles": articles}
-        _news_cache_set(key, payload, ttl=900)
-        return jsonify(payload)
-
-    except Exception as e:
-        # Soft-fail: empty list keeps UI usable
-        payload = {"ok": True, "articles": []}
-        _news_cache_set(key, payload, ttl=300)
-        return jsonify(payload)
-
-
-# ---------- HEALTH ----------
-@stocks_bp.get("/health")
-def health():
-    return jsonify({"ok": True})
+# server/blueprints/stocks.py
+from flask import Blueprint, request, jsonify
+import os, time, math, random, requests
+from bisect import bisect_left
+from core import breaker, cache, candle_store, columnar, encoded, ratelimit, scheduler, singleflight, tiered, voting
+from core import trading_calendar as market
+from core.breaker import CircuitOpen
+from core.config import Config
+from core.cache import LRUCache
+from core.tiered import TieredCache
+from core.ratelimit import RateLimited
+from core.utils import utcnow
+from services import aio, http_client, llm, news
+
+stocks_bp = Blueprint("stocks", __name__, url_prefix="/api/stocks")
+
+
+# ---------- config ----------
+FINNHUB_KEY = Config.FINNHUB_API_KEY  # FINNHUB_KEY, or FINNHUB_API_KEY (core/config.py)
+BASE = "https://finnhub.io/api/v1"
+DEMO_MODE = os.getenv("DEMO_MODE", "0") not in ("0", "", "false", "False")
+
+# ---------- bounded in-memory caches (core/cache.py) ----------
+# sizes in MB per worker; entries expire at their own valid_until
+_MB = 1024 * 1024
+# stale_ttl: how long an expired entry may still be served while a background
+# refresh (core/scheduler.py) replaces it (stale-while-revalidate)
+# key: (symbol, resolution) -> {"covers": count, "payload": superset series (numpy columns), "v": core/encoded.py stamp}
+_CANDLE_CACHE = LRUCache("candles", int(float(os.getenv("CACHE_CANDLES_MB", "64")) * _MB),
+                         stale_ttl=int(os.getenv("CANDLE_STALE_TTL", "172800")))
+QUOTE_TTL = int(os.getenv("QUOTE_TTL", "15"))
+_QUOTE_CACHE = LRUCache("quotes", int(float(os.getenv("CACHE_QUOTES_MB", "4")) * _MB),
+                        stale_ttl=int(os.getenv("QUOTE_STALE_TTL", "900")))
+# profiles and fundamentals change at most daily: per-worker L1 in front of a
+# Mongo L2 shared by all workers (core/tiered.py)
+PROFILE_TTL = int(os.getenv("PROFILE_TTL", "86400"))
+_PROFILE_CACHE = TieredCache("profiles", PROFILE_TTL, int(os.getenv("PROFILE_STALE_TTL", "604800")),
+                             int(float(os.getenv("CACHE_PROFILES_MB", "4")) * _MB))
+METRICS_TTL = int(os.getenv("METRICS_TTL", "0"))  # 0 => next close
+_METRICS_CACHE = TieredCache("metrics", METRICS_TTL, int(os.getenv("METRICS_STALE_TTL", "259200")),
+                             int(float(os.getenv("CACHE_METRICS_MB", "8")) * _MB),
+                             until=market.next_settle if METRICS_TTL == 0 else None)
+# metric=all is large; keep only what the client renders ("all" keeps everything)
+_METRICS_FIELDS = os.getenv(
+    "METRICS_FIELDS",
+    "marketCapitalization,52WeekHigh,52WeekLow,peBasicExclExtraTTM,epsBasicExclExtraItemsTTM,"
+    "revenueTTM,netProfitMarginTTM",
+).strip()
+METRICS_FIELDS = None if _METRICS_FIELDS == "all" else [f.strip() for f in _METRICS_FIELDS.split(",") if f.strip()]
+
+# ---------- quote cache ----------
+QUOTES_MAX_SYMBOLS = int(os.getenv("QUOTES_MAX_SYMBOLS", "50"))
+
+def _quote_cache_set(symbol, payload, ttl=QUOTE_TTL):
+    # quotes don't move outside a session: hold them until the next open
+    _QUOTE_CACHE.set(symbol, payload, valid_until=market.valid_until(ttl))
+
+
+# ---------- candle cache (valid_until) ----------
+def _cache_set_until(key, payload, valid_until_ts: int):
+    _CANDLE_CACHE.set(key, payload, valid_until=int(valid_until_ts))
+
+def _cache_set_ttl(key, payload, ttl_seconds: int):
+    """TTL that only runs during trading sessions (core/trading_calendar.py)."""
+    _cache_set_until(key, payload, int(market.valid_until(int(ttl_seconds))))
+
+# ---------- utils ----------
+def _key_ok() -> bool:
+    return bool(FINNHUB_KEY)
+
+def _err(status: int, msg: str):
+    return jsonify({"ok": False, "error": msg}), status
+
+def _rate_limited(e: RateLimited):
+    resp = jsonify({"ok": False, "error": str(e), "retryAfterMs": e.wait_ms})
+    resp.headers["Retry-After"] = str(max(1, math.ceil(e.wait_ms / 1000)))
+    return resp, 429
+
+def _demo_quote():
+    return {
+        "ok": True, "c": 258.06, "d": 1.58, "dp": 0.616,
+        "h": 258.52, "l": 256.11, "o": 256.52, "pc": 256.48, "t": int(time.time())
+    }
+
+def _demo_series(n=120, base=100.0):
+    vals, v = [], float(base or 100)
+    for i in range(n):
+        v += math.sin(i/7.0)*0.6 + (random.random()-0.5)*0.8
+        v = max(v, 1.0)
+        vals.append(round(v, 2))
+    return vals
+
+def _get(path, params, priority=ratelimit.INTERACTIVE):
+    # identical concurrent calls share one upstream request
+    key = ("finnhub", path, tuple(sorted((params or {}).items())))
+    return singleflight.do(key, lambda: _get_upstream(path, params, priority))
+
+def _get_upstream(path, params, priority=ratelimit.INTERACTIVE):
+    params = dict(params or {})
+    params["token"] = FINNHUB_KEY
+    def call():
+        # cushion against 429 from provider: shared token bucket across workers
+        ratelimit.finnhub.acquire(priority)
+        r = http_client.get(f"{BASE}{path}", params=params, read_timeout=8)
+        if r.status_code != 200:
+            body = (r.text or "").strip()
+            raise requests.HTTPError(f"{r.status_code} {body[:300]}", response=r, request=r.request)
+        return r.json()
+    # candles get their own circuit: a plan without candle access must not trip quotes
+    name = "finnhub-candles" if path == "/stock/candle" else "finnhub"
+    return breaker.call(name, call, retries=1, ignore=(RateLimited,))
+
+async def _aget(path, params, priority=ratelimit.INTERACTIVE):
+    """_get on the worker's event loop (services/aio.py), for concurrent fan-out."""
+    params = dict(params or {})
+    params["token"] = FINNHUB_KEY
+    async def call():
+        await ratelimit.finnhub.aacquire(priority)
+        r = await aio.get(f"{BASE}{path}", params=params, read_timeout=8)
+        if r.status_code != 200:
+            raise requests.HTTPError(f"{r.status_code} {(r.text or '').strip()[:300]}", response=r)
+        return r.json()
+    name = "finnhub-candles" if path == "/stock/candle" else "finnhub"
+    return await breaker.acall(name, call, retries=1, ignore=(RateLimited,))
+
+def _demo_candles(symbol: str, count: int, resolution: str):
+    c = _demo_series(count, 100.0)
+    t = list(range(len(c)))
+    return {
+        "ok": True, "symbol": symbol, "s": "ok",
+        "t": t, "c": c, "o": [], "h": [], "l": [],
+        "meta": {"source": "demo", "resolution": resolution, "from": 0, "to": len(t), "count": len(t)}
+    }
+
+# ---------- refresh policy (override with env if you want) ----------
+# Intraday (60) short TTL; D/W/M cache until next close by default.
+CANDLE_60_TTL = int(os.getenv("CANDLE_60_TTL", "1800"))   # 30 min
+CANDLE_D_TTL  = int(os.getenv("CANDLE_D_TTL",  "0"))      # 0 => next close
+CANDLE_W_TTL  = int(os.getenv("CANDLE_W_TTL",  "0"))
+CANDLE_M_TTL  = int(os.getenv("CANDLE_M_TTL",  "0"))
+
+def _ttl_for(resolution: str) -> int | None:
+    """Return TTL seconds (of trading time) for a resolution or None to expire at the next close."""
+    if resolution == "60":
+        return CANDLE_60_TTL
+    if resolution == "D":
+        return None if CANDLE_D_TTL == 0 else CANDLE_D_TTL
+    if resolution == "W":
+        return None if CANDLE_W_TTL == 0 else CANDLE_W_TTL
+    if resolution == "M":
+        return None if CANDLE_M_TTL == 0 else CANDLE_M_TTL
+    return CANDLE_D_TTL or None
+
+# ---------- Yahoo fallback (no key required) ----------
+def _get_yahoo_candles(symbol: str, resolution: str, count: int, since: int | None = None) -> dict:
+    key = ("yahoo", symbol, resolution, count, since)
+    return singleflight.do(key, lambda: breaker.call(
+        "yahoo", lambda: _fetch_yahoo_candles(symbol, resolution, count, since)))
+
+def _fetch_yahoo_candles(symbol: str, resolution: str, count: int, since: int | None = None) -> dict:
+    """
+    Fetch candles from Yahoo Finance (no API key).
+    Returns our standard payload shape. With `since`, only bars from that
+    timestamp on are requested (and not trimmed to `count`).
+    """
+    # Choose a simple range/interval based on resolution
+    if resolution == "60":
+        rng, interval = "5d", "60m"
+    elif resolution == "W":
+        rng, interval = "2y", "1wk"
+    elif resolution == "M":
+        rng, interval = "5y", "1mo"
+    else:
+        rng, interval = "6mo", "1d"   # default to daily
+
+    url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
+    params = {
+        "range": rng,
+        "interval": interval,
+        "includePrePost": "false",
+        "events": "div,splits",
+    }
+    if since is not None:
+        params.pop("range")
+        params.update(period1=int(since), period2=int(time.time()))
+        rng, count = None, 0
+    r = http_client.get(
+        url,
+        params=params,
+        read_timeout=10,
+        headers={"User-Agent": "Mozilla/5.0"}  # some proxies require UA
+    )
+    if r.status_code != 200:
+        raise requests.HTTPError(f"yahoo {r.status_code}: {r.text[:200]}", response=r)
+
+    data = r.json()
+    result = (data or {}).get("chart", {}).get("result", [])
+    if not result:
+        return {
+            "ok": True, "symbol": symbol, "s": "no_data",
+            "t": [], "c": [], "o": [], "h": [], "l": [],
+            "meta": {"source": "yahoo", "resolution": resolution,
+                     "range": rng, "interval": interval, "count": 0}
+        }
+
+    res0 = result[0]
+    ts = res0.get("timestamp") or []
+    quote = (res0.get("indicators", {}).get("quote") or [{}])[0]
+    c = quote.get("close") or []
+    o = quote.get("open") or []
+    h = quote.get("high") or []
+    l = quote.get("low") or []
+
+    n = min(len(ts), len(c), len(o), len(h), len(l))
+    ts, c, o, h, l = ts[:n], c[:n], o[:n], h[:n], l[:n]
+
+    if count and n > count:
+        ts, c, o, h, l = ts[-count:], c[-count:], o[-count:], h[-count:], l[-count:]
+        n = count
+
+    return {
+        "ok": True, "symbol": symbol, "s": "ok" if n else "no_data",
+        "t": ts, "c": c, "o": o, "h": h, "l": l,
+        "meta": {"source": "yahoo", "resolution": resolution,
+                 "range": rng, "interval": interval, "count": n}
+    }
+
+
+# ---------- QUOTE ----------
+def _fetch_quote(symbol: str, priority=ratelimit.INTERACTIVE) -> dict:
+    data = _get("/quote", {"symbol": symbol}, priority)
+    payload = {"ok": True, **(data or {})}
+    _quote_cache_set(symbol, payload)
+    return payload
+
+async def _afetch_quote(symbol: str) -> dict:
+    data = await _aget("/quote", {"symbol": symbol})
+    payload = {"ok": True, **(data or {})}
+    _quote_cache_set(symbol, payload)
+    return payload
+
+def _refresh_quote(symbol: str):
+    scheduler.submit(("quote", symbol), lambda: _fetch_quote(symbol, ratelimit.BACKGROUND))
+
+@stocks_bp.get("/quote")
+def quote():
+    symbol = (request.args.get("symbol") or "").upper()
+    if not symbol:
+        return _err(400, "symbol required")
+
+    if not _key_ok() and DEMO_MODE:
+        return jsonify(_demo_quote())
+    if not _key_ok():
+        return _err(400, "FINNHUB_KEY missing")
+
+    cached, fresh = _QUOTE_CACHE.lookup(symbol)
+    if cached:
+        if not fresh:
+            _refresh_quote(symbol)
+        return jsonify(cached)
+
+    try:
+        return jsonify(_fetch_quote(symbol))
+    except RateLimited as e:
+        return _rate_limited(e)
+    except (requests.HTTPError, requests.RequestException, CircuitOpen) as e:
+        if DEMO_MODE:
+            return jsonify(_demo_quote())
+        code = getattr(getattr(e, "response", None), "status_code", 502) or 502
+        return _err(code, f"finnhub: {e}")
+
+@stocks_bp.get("/quotes")
+def quotes():
+    """
+    Batch quotes: /api/stocks/quotes?symbols=AAPL,MSFT,...
+    Cache hits (stale ones too, refreshed in the background) are served
+    directly; misses are fetched concurrently on the worker's event loop and
+    share the Finnhub token bucket.
+    Response:
+      { ok: true, quotes: { AAPL: {ok, c, d, dp, ...}, MSFT: {ok: false, error}, ... } }
+    """
+    raw = request.args.get("symbols") or ""
+    symbols = list(dict.fromkeys(s.strip().upper() for s in raw.split(",") if s.strip()))
+    if not symbols:
+        return _err(400, "symbols required")
+    if len(symbols) > QUOTES_MAX_SYMBOLS:
+        return _err(400, f"at most {QUOTES_MAX_SYMBOLS} symbols per request")
+
+    if not _key_ok() and DEMO_MODE:
+        return jsonify({"ok": True, "quotes": {s: _demo_quote() for s in symbols}})
+    if not _key_ok():
+        return _err(400, "FINNHUB_KEY missing")
+
+    out, misses = {}, []
+    for s in symbols:
+        cached, fresh = _QUOTE_CACHE.lookup(s)
+        if cached:
+            out[s] = cached
+            if not fresh:
+                _refresh_quote(s)
+        else:
+            misses.append(s)
+
+    results = aio.gather(*(_afetch_quote(s) for s in misses), return_exceptions=True) if misses else []
+    for s, res in zip(misses, results):
+        if isinstance(res, RateLimited):
+            out[s] = {"ok": False, "error": str(res), "retryAfterMs": res.wait_ms}
+        elif isinstance(res, Exception):
+            out[s] = _demo_quote() if DEMO_MODE else {"ok": False, "error": f"finnhub: {res}"}
+        else:
+            out[s] = res
+
+    return jsonify({"ok": True, "quotes": {s: out[s] for s in symbols}})
+    
+# ---------- CANDLES ----------
+# One canonical series per (symbol, resolution), covering the largest count
+# fetched so far; smaller counts are sliced from it instead of going upstream.
+CANDLE_FETCH_MIN = int(os.getenv("CANDLE_FETCH_MIN", "180"))  # bars per upstream fetch, at least
+CANDLE_LEASE_TTL = float(os.getenv("CANDLE_LEASE_TTL", "15"))  # seconds another worker waits on a fetch
+MAX_CANDLES = int(os.getenv("MAX_CANDLES", "1000"))  # bars per request, at most
+WARM_TOP_N = int(os.getenv("WARM_TOP_N", "25"))  # series refreshed at each close boundary
+
+def _cache_candles(key, covers: int, shaped: dict, resolution: str):
+    entry = {"covers": int(covers), "payload": columnar.arrays(shaped), "v": encoded.stamp()}
+    ttl = _ttl_for(resolution)
+    if ttl is None:
+        _cache_set_until(key, entry, market.next_settle())
+    else:
+        _cache_set_ttl(key, entry, ttl)
+
+def _slice_candles(shaped: dict, count: int) -> dict:
+    """Last `count` bars of a cached series (numpy slices are views: no copy)."""
+    n = len(shaped.get("t", []))
+    if n <= count:
+        return shaped
+    out = {**shaped, "meta": {**(shaped.get("meta") or {}), "count": count}}
+    for col in ("t", "o", "h", "l", "c"):
+        out[col] = shaped.get(col, [])[-count:]
+    return out
+
+# wire formats by Accept (JSON first: it's what */* gets); msgpack only if installed
+_CANDLE_FORMATS = {encoded.JSON: None, columnar.MIMETYPE: columnar.pack}
+if columnar.msgpack is not None:
+    _CANDLE_FORMATS[columnar.MSGPACK_MIMETYPE] = columnar.pack_msgpack
+
+def _candles_response(symbol: str, resolution: str, count: int, version, build):
+    """Candles in the negotiated format and Content-Encoding, encoded once per (version, representation)."""
+    mimetype = request.accept_mimetypes.best_match(list(_CANDLE_FORMATS), default=encoded.JSON)
+    encoding = encoded.accepted_encoding()
+    enc = encoded.cached(("candles", symbol, resolution, count, mimetype, encoding), version, build,
+                         mimetype=mimetype, pack=_CANDLE_FORMATS[mimetype], encoding=encoding)
+    return encoded.respond(enc, vary="Accept, Accept-Encoding")
+
+@stocks_bp.get("/candles")
+def candles():
+    symbol = (request.args.get("symbol") or "").upper()
+    if not symbol:
+        return _err(400, "symbol required")
+
+    resolution = (request.args.get("resolution") or "D").upper()
+    try:
+        count = int(request.args.get("count") or 90)
+    except Exception:
+        count = 90
+    # bounds the upstream window, the stored history and the response-cache keys
+    count = max(1, min(MAX_CANDLES, count))
+
+    key = (symbol, resolution)
+    scheduler.touch("candles", key)
+    cached, fresh = _CANDLE_CACHE.lookup(key)
+    if cached and cached["covers"] >= count:
+        if not fresh:
+            _refresh_candles(symbol, resolution, cached["covers"])
+        # encoded once per (entry, count, representation); later hits write the stored bytes
+        return _candles_response(symbol, resolution, count, cached["v"],
+                                 lambda: _slice_candles(cached["payload"], count))
+
+    # fetch the full superset window so every smaller count is served from it
+    fetch_count = max(count, CANDLE_FETCH_MIN, cached["covers"] if cached else 0)
+    try:
+        shaped = _load_candles(symbol, resolution, fetch_count)
+    except RuntimeError as e:
+        return _err(502, str(e))
+    return _candles_response(symbol, resolution, count, None, lambda: _slice_candles(shaped, count))
+
+def _refresh_candles(symbol: str, resolution: str, covers: int):
+    scheduler.submit(("candles", symbol, resolution),
+                     lambda: _load_candles(symbol, resolution, covers, ratelimit.BACKGROUND))
+
+def _load_candles(symbol: str, resolution: str, fetch_count: int, priority=ratelimit.INTERACTIVE) -> dict:
+    # Concurrent misses (here and in other workers) share one upstream fetch;
+    # a worker that waited on another's lease re-reads the fresh store.
+    started = utcnow()
+    def fetch():
+        return _fetch_and_store_candles(symbol, resolution, fetch_count, priority)
+    def reread():
+        stored = candle_store.load(symbol, resolution, fetch_count, updated_since=started)
+        if not stored:
+            return None
+        shaped = _merge_candles(symbol, resolution, stored, {"t": []}, fetch_count)
+        _cache_candles((symbol, resolution), fetch_count, shaped, resolution)
+        return shaped
+    return singleflight.do(("candles", symbol, resolution, fetch_count), fetch,
+                           lease_ttl=CANDLE_LEASE_TTL, reread=reread)
+
+def _fetch_and_store_candles(symbol: str, resolution: str, fetch_count: int, priority=ratelimit.INTERACTIVE) -> dict:
+    # Persistent history: if it covers the window, only ask for bars since the
+    # newest stored one (re-fetching that bar, it may still have been forming).
+    stored = candle_store.load(symbol, resolution, fetch_count)
+    since = stored["t"][-1] if stored else None
+    fetched = _session_stamps(_fetch_candles(symbol, resolution, fetch_count, since=since, priority=priority),
+                              resolution)
+
+    source = (fetched.get("meta") or {}).get("source")
+    if source != "demo":
+        candle_store.save(symbol, resolution, fetched, covers=None if stored else _covers(fetched, fetch_count))
+    shaped = _merge_candles(symbol, resolution, stored, fetched, fetch_count) if stored else fetched
+
+    # Cache according to policy
+    _cache_candles((symbol, resolution), fetch_count, shaped, resolution)
+    return shaped
+
+def _covers(fetched: dict, fetch_count: int) -> int:
+    """History window a full fetch really covers. Finnhub is asked for exactly
+    the window; Yahoo's fixed ranges (6mo daily) can fall short of it, and then
+    only the bars it returned count, so a larger request goes upstream again."""
+    if (fetched.get("meta") or {}).get("source") == "finnhub":
+        return fetch_count
+    return min(fetch_count, len(fetched.get("t") or []))
+
+def _warm_popular_candles():
+    """Refresh the most-requested next-close series as they expire at the close boundary."""
+    for symbol, resolution in scheduler.popular("candles", WARM_TOP_N):
+        if _ttl_for(resolution) is not None:
+            continue
+        cached, _ = _CANDLE_CACHE.lookup((symbol, resolution))
+        try:
+            _load_candles(symbol, resolution, cached["covers"] if cached else CANDLE_FETCH_MIN,
+                          ratelimit.BACKGROUND)
+        except Exception:
+            pass
+    scheduler.decay("candles")
+
+scheduler.at("warm-candles", market.next_settle, _warm_popular_candles)
+
+def _fetch_candles(symbol: str, resolution: str, count: int, since: int | None = None,
+                   priority=ratelimit.INTERACTIVE) -> dict:
+    """Finnhub first, then Yahoo, then demo data (DEMO_MODE). Raises RuntimeError if all fail."""
+    # If no Finnhub key, we still want data: use Yahoo (or demo if DEMO_MODE)
+    if not _key_ok():
+        try:
+            return _get_yahoo_candles(symbol, resolution, count, since=since)
+        except Exception as e:
+            if DEMO_MODE:
+                return _demo_candles(symbol, count, resolution)
+            raise RuntimeError(f"candles: {e}")
+
+    # Try Finnhub first
+    now = int(time.time())
+    span = {"D": 86400, "W": 604800, "M": 2592000, "60": 60}.get(resolution, 86400)
+    _from = since if since is not None else now - span * count
+
+    try:
+        raw = _get("/stock/candle", {
+            "symbol": symbol, "resolution": resolution, "from": _from, "to": now
+        }, priority)
+        if raw.get("s") == "ok" or (since is not None and raw.get("s") == "no_data"):
+            return {
+                "ok": True, "symbol": symbol, "s": raw.get("s"),
+                "t": raw.get("t", []), "c": raw.get("c", []),
+                "o": raw.get("o", []), "h": raw.get("h", []), "l": raw.get("l", []),
+                "meta": {"source": "finnhub", "resolution": resolution,
+                         "from": _from, "to": now, "count": len(raw.get("t", []))}
+            }
+        raise RuntimeError(f"finnhub returned s={raw.get('s')}")
+    except Exception as finnhub_err:
+        # Finnhub failed or no data -> fallback to Yahoo
+        try:
+            return _get_yahoo_candles(symbol, resolution, count, since=since)
+        except Exception as yahoo_err:
+            if DEMO_MODE:
+                return _demo_candles(symbol, count, resolution)
+            raise RuntimeError(f"finnhub: {finnhub_err} | yahoo: {yahoo_err}")
+
+def _session_ts(t: int) -> int:
+    return t - t % 86400
+
+def _session_stamps(shaped: dict, resolution: str) -> dict:
+    """D/W/M bars stamped at 00:00 UTC of their session date. Finnhub already
+    does; Yahoo stamps them at the 09:30 ET open, so without this a delta from
+    the other provider would store and serve the same session twice."""
+    if resolution == "60" or not shaped.get("t"):
+        return shaped
+    return {**shaped, "t": [_session_ts(int(t)) for t in shaped["t"]]}
+
+def _merge_candles(symbol: str, resolution: str, stored: dict, delta: dict, count: int) -> dict:
+    """Stored history with the delta bars laid over it, trimmed to `count` bars."""
+    if delta.get("meta", {}).get("source") == "demo":
+        delta = {"t": []}
+    if resolution != "60":
+        # history stored before stamps were normalized: one bar per session, the later one wins
+        st = [_session_ts(int(t)) for t in stored["t"]]
+        idx = [i for i in range(len(st)) if i + 1 == len(st) or st[i] != st[i + 1]]
+        stored = {**stored, "t": [st[i] for i in idx],
+                  **{col: [stored[col][i] for i in idx] for col in ("o", "h", "l", "c")}}
+    dt = delta.get("t") or []
+    keep = bisect_left(stored["t"], dt[0]) if dt else len(stored["t"])
+    out = {
+        "ok": True, "symbol": symbol, "s": "ok",
+        "meta": {"source": (delta.get("meta") or {}).get("source") or stored.get("source"),
+                 "store": True, "resolution": resolution, "delta": len(dt)},
+    }
+    for col in ("t", "o", "h", "l", "c"):
+        out[col] = (stored[col][:keep] + (delta.get(col) or []))[-count:]
+    out["meta"]["count"] = len(out["t"])
+    return out
+
+# ---------- PROFILE ----------
+def _fetch_profile(symbol: str, priority=ratelimit.INTERACTIVE) -> dict:
+    data = _get("/stock/profile2", {"symbol": symbol}, priority)
+    payload = {"ok": True, **(data or {})}
+    news.remember_name(symbol, payload.get("name"))
+    return payload
+
+@stocks_bp.get("/profile")
+def profile():
+    symbol = (request.args.get("symbol") or "").upper()
+    if not symbol:
+        return _err(400, "symbol required")
+
+    if not _key_ok() and DEMO_MODE:
+        return jsonify({"ok": True, "ticker": symbol or "AAPL", "name": "Demo Inc", "exchange": "DEMO", "currency": "USD"})
+    if not _key_ok():
+        return _err(400, "FINNHUB_KEY missing")
+
+    try:
+        return jsonify(_PROFILE_CACHE.get(symbol, lambda priority: _fetch_profile(symbol, priority)))
+    except RateLimited as e:
+        return _rate_limited(e)
+    except (requests.HTTPError, requests.RequestException, CircuitOpen) as e:
+        if DEMO_MODE:
+            return jsonify({"ok": True, "ticker": symbol, "name": "Demo Inc", "exchange": "DEMO", "currency": "USD"})
+        code = getattr(getattr(e, "response", None), "status_code", 502) or 502
+        return _err(code, f"finnhub: {e}")
+
+# ---------- METRICS ----------
+def _fetch_metrics(symbol: str, priority=ratelimit.INTERACTIVE) -> dict:
+    data = _get("/stock/metric", {"symbol": symbol, "metric": "all"}, priority) or {}
+    if METRICS_FIELDS is not None:
+        metric = data.get("metric") or {}
+        data = {"symbol": data.get("symbol", symbol), "metricType": data.get("metricType"),
+                "metric": {f: metric[f] for f in METRICS_FIELDS if f in metric}}
+    return {"ok": True, **data}
+
+@stocks_bp.get("/metrics")
+def metrics():
+    symbol = (request.args.get("symbol") or "").upper()
+    if not symbol:
+        return _err(400, "symbol required")
+
+    if not _key_ok() and DEMO_MODE:
+        return jsonify({"ok": True, "metric": {"marketCapitalization": 0.0, "peBasicExclExtraTTM": 38.5}})
+    if not _key_ok():
+        return _err(400, "FINNHUB_KEY missing")
+
+    try:
+        return jsonify(_METRICS_CACHE.get(symbol, lambda priority: _fetch_metrics(symbol, priority)))
+    except RateLimited as e:
+        return _rate_limited(e)
+    except (requests.HTTPError, requests.RequestException, CircuitOpen) as e:
+        if DEMO_MODE:
+            return jsonify({"ok": True, "metric": {"marketCapitalization": 0.0, "peBasicExclExtraTTM": 38.5}})
+        code = getattr(getattr(e, "response", None), "status_code", 502) or 502
+        return _err(code, f"finnhub: {e}")
+
+
+@stocks_bp.get("/news")
+def stock_news():
+    """
+    Return latest news articles for a symbol using NewsAPI.org.
+    Response:
+      { ok: true, articles: [{title, url, source, publishedAt, image, description}] }
+    """
+    symbol = (request.args.get("symbol") or "").upper()
+    if not symbol:
+        return _err(400, "symbol required")
+
+    try:
+        limit = max(1, min(int(request.args.get("limit", 8)), 30))
+    except Exception:
+        limit = 8
+
+    try:
+        entry = news.entry(symbol, limit)
+    except Exception:
+        # Soft-fail: empty list keeps UI usable
+        return jsonify({"ok": True, "articles": []})
+    return encoded.respond(encoded.cached(("news", symbol, limit), entry["v"],
+                                          lambda: {"ok": True, "articles": entry["articles"][:limit]}))
+
+
+# ---------- HEALTH ----------
+@stocks_bp.get("/health")
+def health():
+    return jsonify({"ok": True, "ratelimit": ratelimit.stats(), "cache": cache.stats(),
+                    "singleflight": singleflight.stats(), "scheduler": scheduler.stats(),
+                    "http": http_client.stats(), "providers": breaker.stats(),
+                    "tiered": tiered.stats(), "votes": voting.stats(), "llm": llm.stats()})
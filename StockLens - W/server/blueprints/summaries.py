@@ -1,35 +1,181 @@
-from flask import Blueprint, request, jsonify
-from services.ollama_client import generate_with_ollama
-from services.llm_fallback import generate_with_openai
-from core.db import threads, comments
-
-summaries_bp = Blueprint("summaries", __name__, url_prefix="/api/summaries")
-
-
-def _collect_symbol_context(symbol: str, limit_threads=10, limit_comments=30):
-    th = list(threads.find({"symbol": symbol}).sort("reliabilityScore", -1).limit(limit_threads))
-    tids = [t.get("_id") for t in th]
-    cm = list(comments.find({"threadId": {"$in": tids}}).sort("createdAt", -1).limit(limit_comments))
-    def clean(t):
-        return {
-            "title": t.get("title"),
-            "stance": t.get("stance"),
-            "rs": float(t.get("reliabilityScore", 0.0)),
-        }
-    def clean_c(c):
-        return {"body": c.get("body", "")[:200]}
-    return [clean(x) for x in th], [clean_c(x) for x in cm]
-
-
-@summaries_bp.get("/community/<symbol>")
-def summarize_community(symbol):
-    symbol = (symbol or "").upper().strip()
-    th, cm = _collect_symbol_context(symbol)
-    prompt = (
-        "Summarize the community's current impression of {sym}. "
-        "Use 3 concise bullet points: overall stance, key arguments (both sides), "
-        "and risk/uncertainty. Be neutral; do NOT give financial advice.\n\n"
-        f"Threads: {th}\nComments: {cm}"
-    ).format(sym=symbol)
-    txt = generate_with_ollama(prompt) or generate_with_openai(prompt) or "Summary unavailable."
-    return jsonify({"symbol": symbol, "summary": txt, "threads_count": len(th)})
\ No newline at end of file
+import hashlib, json, os, time
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from services import llm
+from services.ollama_client import stream_with_ollama
+from services.llm_fallback import stream_with_openai
+from core import scheduler, singleflight
+from core.cache import LRUCache
+from core.db import threads, comments, summaries
+from core.utils import utcnow
+
+summaries_bp = Blueprint("summaries", __name__, url_prefix="/api/summaries")
+
+# ---------- summary cache ----------
+# Summaries are stored in Mongo under a hash of the exact prompt (i.e. the
+# thread/comment context), so the LLM only runs when that context changes.
+# Per worker, the last summary per symbol is served from memory; once it is
+# SUMMARY_TTL old the context is re-hashed in the background.
+SUMMARY_TTL = int(os.getenv("SUMMARY_TTL", "30"))
+SUMMARY_LEASE_TTL = float(os.getenv("SUMMARY_LEASE_TTL", "30"))  # seconds another worker waits on a generation
+SUMMARY_WARM_TOP_N = int(os.getenv("SUMMARY_WARM_TOP_N", "20"))
+SUMMARY_WARM_INTERVAL = float(os.getenv("SUMMARY_WARM_INTERVAL", "120"))
+_UNAVAILABLE = "Summary unavailable."
+# symbol -> {"hash", "summary", "threads_count"}
+_SUMMARY_CACHE = LRUCache("summaries", int(float(os.getenv("CACHE_SUMMARIES_MB", "4")) * 1024 * 1024),
+                          stale_ttl=int(os.getenv("SUMMARY_STALE_TTL", "86400")))
+
+
+def _collect_symbol_context(symbol: str, limit_threads=10, limit_comments=30):
+    th = list(threads.find({"symbol": symbol}).sort("reliabilityScore", -1).limit(limit_threads))
+    tids = [t.get("_id") for t in th]
+    cm = list(comments.find({"threadId": {"$in": tids}}).sort("createdAt", -1).limit(limit_comments))
+    def clean(t):
+        return {
+            "title": t.get("title"),
+            "stance": t.get("stance"),
+            "rs": float(t.get("reliabilityScore", 0.0)),
+        }
+    def clean_c(c):
+        return {"body": c.get("body", "")[:200]}
+    return [clean(x) for x in th], [clean_c(x) for x in cm]
+
+
+def _prompt(symbol: str, th, cm) -> str:
+    # one f-string: str.format() on the result would trip over the braces in the context dicts
+    return (
+        f"Summarize the community's current impression of {symbol}. "
+        "Use 3 concise bullet points: overall stance, key arguments (both sides), "
+        "and risk/uncertainty. Be neutral; do NOT give financial advice.\n\n"
+        f"Threads: {th}\nComments: {cm}"
+    )
+
+
+def _context(symbol: str):
+    """(prompt, context hash, thread count) for the symbol's current threads and comments."""
+    th, cm = _collect_symbol_context(symbol)
+    prompt = _prompt(symbol, th, cm)
+    return prompt, hashlib.sha256(prompt.encode()).hexdigest(), len(th)
+
+
+def _stored(h: str):
+    doc = summaries.find_one({"_id": h}, {"summary": 1})
+    return doc["summary"] if doc else None
+
+
+def _store(symbol: str, h: str, txt: str, n: int) -> dict:
+    summaries.replace_one({"_id": h}, {"symbol": symbol, "summary": txt, "createdAt": utcnow()}, upsert=True)
+    return _remember(symbol, h, txt, n)
+
+
+def _remember(symbol: str, h: str, txt: str | None, n: int) -> dict:
+    entry = {"hash": h, "summary": txt or _UNAVAILABLE, "threads_count": n}
+    if txt:  # provider failures aren't cached
+        _SUMMARY_CACHE.set(symbol, entry, ttl=SUMMARY_TTL)
+    return entry
+
+
+def _summary_for(symbol: str) -> dict:
+    """Summary of the symbol's current context: stored by context hash, generated only on a new hash."""
+    prompt, h, n = _context(symbol)
+
+    def generate():
+        txt = _stored(h)
+        if txt:
+            return txt
+        txt = llm.generate(prompt)
+        if txt:
+            _store(symbol, h, txt, n)
+        return txt
+
+    txt = _stored(h) or singleflight.do(("summary", h), generate, lease_ttl=SUMMARY_LEASE_TTL,
+                                         reread=lambda: _stored(h))
+    return _remember(symbol, h, txt, n)
+
+
+def _refresh_summary(symbol: str):
+    scheduler.submit(("summary", symbol), lambda: _summary_for(symbol))
+
+
+def _warm_summaries():
+    """Keep the most-viewed symbols' summaries current so views never wait on the LLM."""
+    for symbol in scheduler.popular("summaries", SUMMARY_WARM_TOP_N):
+        _refresh_summary(symbol)
+    scheduler.decay("summaries")
+
+scheduler.at("warm-summaries", lambda: time.time() + SUMMARY_WARM_INTERVAL, _warm_summaries)
+
+
+@summaries_bp.get("/community/<symbol>")
+def summarize_community(symbol):
+    symbol = (symbol or "").upper().strip()
+    scheduler.touch("summaries", symbol)
+    entry, fresh = _SUMMARY_CACHE.lookup(symbol)
+    if entry is None:
+        entry = _summary_for(symbol)
+    elif not fresh:
+        _refresh_summary(symbol)
+    return jsonify({"symbol": symbol, "summary": entry["summary"], "threads_count": entry["threads_count"]})
+
+
+# ---------- streaming (SSE) ----------
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _stream_llm(prompt: str):
+    """Yield text chunks from Ollama, or from OpenAI if Ollama fails before its first chunk."""
+    for fn in (stream_with_ollama, stream_with_openai):
+        started = False
+        try:
+            for chunk in fn(prompt):
+                started = True
+                yield chunk
+            if started:
+                return
+        except Exception:
+            if started:
+                raise
+
+
+@summaries_bp.get("/community/<symbol>/stream")
+def stream_community(symbol):
+    """
+    Server-Sent Events variant of /community/<symbol>:
+      event: token  data: {"text": "..."}                  (repeated)
+      event: done   data: {"symbol", "summary", "threads_count", "cached"}
+      event: error  data: {"error": "..."}
+    A cached summary for the current context is sent as a single token.
+    Chunks are yielded one at a time, so a slow client slows the upstream
+    read, and a disconnect closes the generator chain down to the provider
+    connection, which stops generation upstream.
+    """
+    symbol = (symbol or "").upper().strip()
+    scheduler.touch("summaries", symbol)
+    entry, fresh = _SUMMARY_CACHE.lookup(symbol)
+    if entry is not None and fresh:
+        prompt, h, n, cached = None, entry["hash"], entry["threads_count"], entry["summary"]
+    else:
+        prompt, h, n = _context(symbol)
+        cached = _stored(h)
+
+    def events():
+        if cached:
+            _remember(symbol, h, cached, n)
+            yield _sse("token", {"text": cached})
+            yield _sse("done", {"symbol": symbol, "summary": cached, "threads_count": n, "cached": True})
+            return
+        parts = []
+        try:
+            for chunk in _stream_llm(prompt):
+                parts.append(chunk)
+                yield _sse("token", {"text": chunk})
+        except Exception:
+            yield _sse("error", {"error": "summary stream failed"})
+            return
+        txt = "".join(parts).strip()
+        if txt:
+            _store(symbol, h, txt, n)
+        yield _sse("done", {"symbol": symbol, "summary": txt or _UNAVAILABLE, "threads_count": n, "cached": False})
+
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
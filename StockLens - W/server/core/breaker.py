@@ -0,0 +1,237 @@
+"""
+Per-provider health tracking and circuit breaking.
+
+Each provider keeps an error-rate and latency EWMA. After repeated failures
+(or a high error rate) its circuit opens and calls fail fast with CircuitOpen,
+so callers go straight to their fallback provider. Once the cooldown passes, a
+single half-open probe decides whether to close the circuit or to re-open it
+with a longer cooldown. Retry-After from the provider is honored, and retries
+back off with jittered exponential delays based on consecutive failures.
+"""
+import asyncio, email.utils, os, random, threading, time
+
+FAIL_THRESHOLD = int(os.getenv("BREAKER_FAIL_THRESHOLD", "3"))     # consecutive failures
+ERROR_RATE = float(os.getenv("BREAKER_ERROR_RATE", "0.5"))          # error EWMA to open at
+MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "10"))               # before error rate counts
+COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "15"))               # seconds, doubles per re-open
+COOLDOWN_MAX = float(os.getenv("BREAKER_COOLDOWN_MAX", "600"))
+BACKOFF_BASE = float(os.getenv("BREAKER_BACKOFF_BASE", "0.2"))      # seconds
+BACKOFF_MAX = float(os.getenv("BREAKER_BACKOFF_MAX", "3"))
+ALPHA = float(os.getenv("BREAKER_EWMA_ALPHA", "0.2"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpen(Exception):
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(f"{provider} circuit open, retry in {retry_in:.1f}s")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+class ProviderHealth:
+    def __init__(self, name: str):
+        self.name = name
+        self.state = CLOSED
+        self.calls = 0
+        self.failures = 0            # consecutive
+        self.opens = 0               # consecutive re-opens, for cooldown growth
+        self.error_ewma = 0.0
+        self.latency_ewma_ms = 0.0
+        self.open_until = 0.0
+        self.probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.time() >= self.open_until:
+                self.state = HALF_OPEN
+                self.probing = False
+            if self.state == HALF_OPEN and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def retry_in(self) -> float:
+        return max(0.0, self.open_until - time.time())
+
+    def _observe(self, ms: float, failed: bool):
+        self.calls += 1
+        self.error_ewma += ALPHA * ((1.0 if failed else 0.0) - self.error_ewma)
+        self.latency_ewma_ms = ms if self.calls == 1 else self.latency_ewma_ms + ALPHA * (ms - self.latency_ewma_ms)
+
+    def record_success(self, ms: float):
+        with self._lock:
+            self._observe(ms, failed=False)
+            self.failures = 0
+            if self.state != CLOSED:
+                self.state, self.opens, self.probing = CLOSED, 0, False
+
+    def record_failure(self, ms: float, retry_after: float | None = None):
+        with self._lock:
+            self._observe(ms, failed=True)
+            self.failures += 1
+            now = time.time()
+            trip = (
+                self.state == HALF_OPEN
+                or self.failures >= FAIL_THRESHOLD
+                or (self.calls >= MIN_CALLS and self.error_ewma >= ERROR_RATE)
+            )
+            if trip:
+                cooldown = min(COOLDOWN_MAX, COOLDOWN * (2 ** self.opens))
+                self.opens += 1
+                self.state, self.probing = OPEN, False
+                self.open_until = max(self.open_until, now + cooldown)
+            if retry_after:
+                # the provider told us when to come back: stay away until then
+                self.state, self.probing = OPEN, False
+                self.open_until = max(self.open_until, now + retry_after)
+
+    def backoff(self) -> float:
+        """Delay before retrying: jittered exponential in consecutive failures."""
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** max(0, self.failures - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state, "calls": self.calls, "consecutiveFailures": self.failures,
+                "errorRate": round(self.error_ewma, 3), "latencyMs": round(self.latency_ewma_ms, 1),
+                "retryIn": round(self.retry_in(), 1) if self.state != CLOSED else 0.0,
+            }
+
+
+_lock = threading.Lock()
+_providers: dict = {}
+
+
+def provider(name: str) -> ProviderHealth:
+    with _lock:
+        h = _providers.get(name)
+        if h is None:
+            h = _providers[name] = ProviderHealth(name)
+        return h
+
+
+def retry_after(exc: Exception) -> float | None:
+    """Seconds from a Retry-After header on the exception's response, if any."""
+    resp = getattr(exc, "response", None)
+    value = getattr(resp, "headers", {}).get("Retry-After") if resp is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        dt = email.utils.parsedate_to_datetime(value)
+        return max(0.0, dt.timestamp() - time.time()) if dt else None
+
+
+def call(name: str, fn, retries: int = 0, ignore: tuple = ()):
+    """Run fn() through `name`'s circuit, retrying with adaptive backoff.
+
+    Exceptions listed in `ignore` pass through without counting as failures.
+    """
+    h = provider(name)
+    for attempt in range(retries + 1):
+        if not h.allow():
+            raise CircuitOpen(name, h.retry_in())
+        t0 = time.perf_counter()
+        try:
+            result = fn()
+        except ignore:
+            with h._lock:
+                h.probing = False
+            raise
+        except Exception as e:
+            h.record_failure((time.perf_counter() - t0) * 1000, retry_after(e))
+            if attempt < retries and h.state == CLOSED:
+                time.sleep(h.backoff())
+                continue
+            raise
+        h.record_success((time.perf_counter() - t0) * 1000)
+        return result
+
+
+async def acall(name: str, coro_fn, retries: int = 0, ignore: tuple = ()):
+    """call() for coroutines: coro_fn() is awaited and backoff uses asyncio.sleep."""
+    h = provider(name)
+    for attempt in range(retries + 1):
+        if not h.allow():
+            raise CircuitOpen(name, h.retry_in())
+        t0 = time.perf_counter()
+        try:
+            result = await coro_fn()
+        except ignore:
+            with h._lock:
+                h.probing = False
+            raise
+        except Exception as e:
+            h.record_failure((time.perf_counter() - t0) * 1000, retry_after(e))
+            if attempt < retries and h.state == CLOSED:
+                await asyncio.sleep(h.backoff())
+                continue
+            raise
+        h.record_success((time.perf_counter() - t0) * 1000)
+        return result
+
+
+def stream(name: str, gen_fn):
+    """call() for generators: yields gen_fn()'s items through `name`'s circuit.
+
+    Latency is time to the first item. Closing the stream early (the client
+    went away) counts as neither a success nor a failure.
+    """
+    h = provider(name)
+    if not h.allow():
+        raise CircuitOpen(name, h.retry_in())
+    t0 = time.perf_counter()
+    first_ms = None
+    gen = gen_fn()
+    try:
+        for item in gen:
+            if first_ms is None:
+                first_ms = (time.perf_counter() - t0) * 1000
+            yield item
+    except GeneratorExit:
+        with h._lock:
+            h.probing = False
+        raise
+    except Exception as e:
+        h.record_failure((time.perf_counter() - t0) * 1000, retry_after(e))
+        raise
+    finally:
+        gen.close()
+    h.record_success(first_ms if first_ms is not None else (time.perf_counter() - t0) * 1000)
+
+
+async def astream(name: str, agen_fn):
+    """stream() for async generators; cancelling the consumer counts like closing early."""
+    h = provider(name)
+    if not h.allow():
+        raise CircuitOpen(name, h.retry_in())
+    t0 = time.perf_counter()
+    first_ms = None
+    agen = agen_fn()
+    try:
+        async for item in agen:
+            if first_ms is None:
+                first_ms = (time.perf_counter() - t0) * 1000
+            yield item
+    except (GeneratorExit, asyncio.CancelledError):
+        with h._lock:
+            h.probing = False
+        raise
+    except Exception as e:
+        h.record_failure((time.perf_counter() - t0) * 1000, retry_after(e))
+        raise
+    finally:
+        await agen.aclose()
+    h.record_success(first_ms if first_ms is not None else (time.perf_counter() - t0) * 1000)
+
+
+def stats() -> dict:
+    with _lock:
+        items = list(_providers.items())
+    return {name: h.stats() for name, h in items}
@@ -0,0 +1,154 @@
+"""
+Bounded in-process LRU cache with per-entry expiry.
+
+Memory is capped by an approximate byte size per cache; the least recently
+used entries are evicted first. Entries past `valid_until` stop being served
+(except through allow_stale, for up to `stale_ttl` seconds) and are dropped by
+a background sweeper, so keys that are never read again do not pile up.
+"""
+import os, sys, threading, time
+from collections import OrderedDict
+
+SWEEP_INTERVAL = float(os.getenv("CACHE_SWEEP_INTERVAL", "60"))  # seconds
+
+
+def approx_size(obj) -> int:
+    """Rough deep size in bytes of a JSON-like payload (or of a __slots__ object holding one,
+    like core/encoded.py's Encoded)."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(approx_size(k) + approx_size(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(approx_size(x) for x in obj)
+    elif hasattr(type(obj), "__slots__"):
+        slots = type(obj).__slots__
+        size += sum(approx_size(getattr(obj, a, None)) for a in ((slots,) if isinstance(slots, str) else slots))
+    return size
+
+
+class _Entry:
+    __slots__ = ("value", "valid_until", "size")
+
+    def __init__(self, value, valid_until: float, size: int):
+        self.value = value
+        self.valid_until = valid_until
+        self.size = size
+
+
+class LRUCache:
+    def __init__(self, name: str, max_bytes: int, stale_ttl: float = 0):
+        self.name = name
+        self.max_bytes = int(max_bytes)
+        self.stale_ttl = float(stale_ttl)
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._stats = {"hits": 0, "staleHits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+        _CACHES.append(self)
+
+    def get(self, key, allow_stale: bool = False):
+        value, fresh = self.lookup(key, allow_stale=allow_stale)
+        return value
+
+    def lookup(self, key, allow_stale: bool = True):
+        """Return (value, fresh). Stale values (within stale_ttl) come back with fresh=False."""
+        now = time.time()
+        with self._lock:
+            e = self._data.get(key)
+            if e is None:
+                self._stats["misses"] += 1
+                return None, False
+            if e.valid_until > now:
+                self._data.move_to_end(key)
+                self._stats["hits"] += 1
+                return e.value, True
+            if e.valid_until + self.stale_ttl <= now:
+                self._remove(key)
+                self._stats["expirations"] += 1
+            elif allow_stale:
+                self._data.move_to_end(key)
+                self._stats["staleHits"] += 1
+                return e.value, False
+            self._stats["misses"] += 1
+            return None, False
+
+    def set(self, key, value, ttl: float | None = None, valid_until: float | None = None):
+        if valid_until is None:
+            valid_until = time.time() + (ttl or 0)
+        size = approx_size(key) + approx_size(value)
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._data[key] = _Entry(value, float(valid_until), size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                old_key, _ = next(iter(self._data.items()))
+                self._remove(old_key)
+                self._stats["evictions"] += 1
+        _ensure_sweeper()
+
+    def pop(self, key):
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def _remove(self, key):
+        e = self._data.pop(key)
+        self._bytes -= e.size
+
+    def sweep(self) -> int:
+        """Drop entries past their stale window. Returns how many were removed."""
+        cutoff = time.time() - self.stale_ttl
+        with self._lock:
+            dead = [k for k, e in self._data.items() if e.valid_until <= cutoff]
+            for k in dead:
+                self._remove(k)
+            self._stats["expirations"] += len(dead)
+        return len(dead)
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+            s.update(entries=len(self._data), bytes=self._bytes, maxBytes=self.max_bytes)
+        lookups = s["hits"] + s["staleHits"] + s["misses"]
+        s["hitRate"] = round((s["hits"] + s["staleHits"]) / lookups, 4) if lookups else 0.0
+        return s
+
+
+# ---------- background sweeper (one per process) ----------
+_CACHES: list = []
+_sweeper = None
+_sweeper_pid = None
+_sweeper_lock = threading.Lock()
+
+
+def _sweep_forever():
+    while True:
+        time.sleep(SWEEP_INTERVAL)
+        for c in list(_CACHES):
+            try:
+                c.sweep()
+            except Exception:
+                pass
+
+
+def _ensure_sweeper():
+    # started lazily so each forked worker gets its own thread
+    global _sweeper, _sweeper_pid
+    if _sweeper is not None and _sweeper_pid == os.getpid() and _sweeper.is_alive():
+        return
+    with _sweeper_lock:
+        if _sweeper is not None and _sweeper_pid == os.getpid() and _sweeper.is_alive():
+            return
+        _sweeper = threading.Thread(target=_sweep_forever, name="cache-sweeper", daemon=True)
+        _sweeper.start()
+        _sweeper_pid = os.getpid()
+
+
+def stats() -> dict:
+    return {c.name: c.stats() for c in _CACHES}
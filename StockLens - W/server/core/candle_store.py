@@ -0,0 +1,76 @@
+"""
+Persistent candle history shared by all workers.
+
+Bars live in `candles`, one document per (symbol, resolution, t). Each series
+also has a `candle_series` doc recording how many bars of history it covers
+and the newest bar stored, so a cache miss only asks upstream for the bars
+since then.
+"""
+from datetime import datetime
+from pymongo import DeleteMany, UpdateOne
+from pymongo.errors import PyMongoError
+from core.db import candles, candle_series
+from core.utils import utcnow
+
+COLS = ("o", "h", "l", "c")
+
+
+def _sid(symbol: str, resolution: str) -> str:
+    return f"{symbol}:{resolution}"
+
+
+def load(symbol: str, resolution: str, count: int, updated_since: datetime | None = None) -> dict | None:
+    """Last `count` stored bars, or None if stored history does not cover `count`
+    (or was not written since `updated_since`)."""
+    try:
+        meta = candle_series.find_one({"_id": _sid(symbol, resolution)})
+        if not meta or int(meta.get("covers", 0)) < count:
+            return None
+        if updated_since is not None and (meta.get("updatedAt") or datetime.min) < updated_since:
+            return None
+        rows = list(
+            candles.find({"symbol": symbol, "resolution": resolution}, {"_id": 0, "t": 1, **{c: 1 for c in COLS}})
+            .sort("t", -1)
+            .limit(count)
+        )
+    except PyMongoError:
+        return None
+    if not rows:
+        return None
+    rows.reverse()
+    out = {"t": [r["t"] for r in rows], "covers": int(meta["covers"]), "source": meta.get("source")}
+    for col in COLS:
+        out[col] = [r.get(col) for r in rows]
+    return out
+
+
+def save(symbol: str, resolution: str, shaped: dict, covers: int | None = None):
+    """Upsert the bars of a shaped payload; `covers` records a complete history window."""
+    t = shaped.get("t") or []
+    if not t:
+        return
+    cols = {col: shaped.get(col) or [] for col in COLS}
+    ops = []
+    if resolution != "60":
+        # bars of these sessions stored under another provider's stamp (see blueprints/stocks.py _session_stamps)
+        ops.append(DeleteMany({"symbol": symbol, "resolution": resolution,
+                               "t": {"$gte": t[0], "$lt": t[-1] + 86400, "$nin": list(t)}}))
+    ops += [
+        UpdateOne(
+            {"symbol": symbol, "resolution": resolution, "t": ts},
+            {"$set": {col: (vals[i] if i < len(vals) else None) for col, vals in cols.items()}},
+            upsert=True,
+        )
+        for i, ts in enumerate(t)
+    ]
+    update = {"$set": {
+        "symbol": symbol, "resolution": resolution, "lastT": t[-1],
+        "source": (shaped.get("meta") or {}).get("source"), "updatedAt": utcnow(),
+    }}
+    if covers:
+        update["$max"] = {"covers": int(covers)}
+    try:
+        candles.bulk_write(ops, ordered=False)
+        candle_series.update_one({"_id": _sid(symbol, resolution)}, update, upsert=True)
+    except PyMongoError:
+        pass
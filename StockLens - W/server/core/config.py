@@ -1,12 +1,14 @@
-import os
-
-class Config:
-    PORT = int(os.getenv("PORT", 5001))
-    MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/stocklens")
-    JWT_SECRET = os.getenv("JWT_SECRET", "change_me")
-    ALLOW_ORIGINS = [o.strip() for o in os.getenv("ALLOW_ORIGINS", "http://localhost:5173").split(",")]
-    FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY", "")
-    NEWSAPI_KEY = os.getenv("NEWSAPI_KEY", "")
-    OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
-    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-    OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
\ No newline at end of file
+import os
+
+class Config:
+    PORT = int(os.getenv("PORT", 5001))
+    MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/stocklens")
+    JWT_SECRET = os.getenv("JWT_SECRET", "change_me")
+    ALLOW_ORIGINS = [o.strip() for o in os.getenv("ALLOW_ORIGINS", "http://localhost:5173").split(",")]
+    # the stocks blueprint reads FINNHUB_KEY: either name configures the one key
+    FINNHUB_API_KEY = (os.getenv("FINNHUB_API_KEY") or os.getenv("FINNHUB_KEY", "")).strip()
+    NEWSAPI_KEY = os.getenv("NEWSAPI_KEY", "")
+    OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+    OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
\ No newline at end of file
@@ -1,19 +1,36 @@
-from pymongo import MongoClient, ASCENDING, DESCENDING
-import os
-
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://mongo:27017")
-DB_NAME = os.environ.get("MONGO_DB", "stocklens")
-
-_client = MongoClient(MONGO_URL)
-_db = _client[DB_NAME]
-
-users = _db["users"]
-threads = _db["threads"]
-comments = _db["comments"]
-votes = _db["votes"]
-
-# indexes
-users.create_index("email", unique=True)
-threads.create_index([("symbol", ASCENDING), ("createdAt", DESCENDING)])
-comments.create_index([("threadId", ASCENDING), ("createdAt", ASCENDING)])
-votes.create_index([("userId", ASCENDING), ("type", ASCENDING), ("entityId", ASCENDING)], unique=True)
+from pymongo import MongoClient, ASCENDING, DESCENDING
+import os
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://mongo:27017")
+DB_NAME = os.environ.get("MONGO_DB", "stocklens")
+
+_client = MongoClient(MONGO_URL)
+_db = _client[DB_NAME]
+
+users = _db["users"]
+threads = _db["threads"]
+comments = _db["comments"]
+votes = _db["votes"]
+ratelimits = _db["ratelimits"]
+candles = _db["candles"]
+candle_series = _db["candle_series"]
+leases = _db["leases"]
+symbol_stats = _db["symbol_stats"]
+summaries = _db["summaries"]
+tiered_cache = _db["tiered_cache"]
+versions = _db["versions"]
+
+# indexes
+users.create_index("email", unique=True)
+threads.create_index([("symbol", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)])
+threads.create_index([("createdAt", DESCENDING), ("_id", DESCENDING)])
+threads.create_index([("symbol", ASCENDING), ("reliabilityScore", DESCENDING), ("_id", ASCENDING)])
+threads.create_index([("reliabilityScore", DESCENDING), ("_id", ASCENDING)])
+threads.create_index([("symbol", ASCENDING), ("hotness", DESCENDING), ("_id", DESCENDING)])
+threads.create_index([("hotness", DESCENDING), ("_id", DESCENDING)])
+comments.create_index([("threadId", ASCENDING), ("createdAt", ASCENDING), ("_id", ASCENDING)])
+votes.create_index([("userId", ASCENDING), ("type", ASCENDING), ("entityId", ASCENDING)], unique=True)
+candles.create_index([("symbol", ASCENDING), ("resolution", ASCENDING), ("t", ASCENDING)], unique=True)
+leases.create_index("expiresAt", expireAfterSeconds=0)
+summaries.create_index("createdAt", expireAfterSeconds=7 * 86400)
+tiered_cache.create_index("expiresAt", expireAfterSeconds=0)
@@ -0,0 +1,122 @@
+"""
+Pre-encoded JSON responses with strong ETags.
+
+cached() keeps the encoded body of a response (and an ETag hashed from it
+when it is written) under a key, tagged with the version of the data it was
+built from. As long as that version doesn't change, a hit is a buffer write:
+no payload rebuild and no JSON encoding. respond() answers If-None-Match
+with a bodiless 304. encode() can also pack a payload into another wire
+format and compress it (gzip, or brotli when installed) for clients that
+accept it.
+
+Versions come from the data's owner: stamp() for entries of an in-process
+cache (a new stamp per write), or version(name) for data shared by every
+worker, a counter in Mongo that writers move with bump(name).
+"""
+import gzip, hashlib, itertools, json, os
+from datetime import date
+import numpy as np
+from flask import Response, request
+from pymongo.errors import PyMongoError
+from werkzeug.http import http_date
+from core.cache import LRUCache
+from core.db import versions
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+JSON = "application/json"
+RESPONSE_TTL = int(os.getenv("RESPONSE_TTL", "86400"))  # entries are checked against their version anyway
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "512"))
+_RESPONSES = LRUCache("responses", int(float(os.getenv("CACHE_RESPONSES_MB", "32")) * 1024 * 1024))
+_stamps = itertools.count(1)
+
+
+class Encoded:
+    __slots__ = ("body", "etag", "mimetype", "encoding")
+
+    def __init__(self, body: bytes, etag: str, mimetype: str = JSON, encoding: str | None = None):
+        self.body = body
+        self.etag = etag
+        self.mimetype = mimetype
+        self.encoding = encoding
+
+
+def _default(o):
+    # what jsonify does for the types our payloads carry, plus array-backed series
+    if isinstance(o, date):
+        return http_date(o)
+    if isinstance(o, np.ndarray):
+        if o.dtype.kind == "f" and np.isnan(o).any():
+            return [None if x != x else x for x in o.tolist()]  # NaN isn't JSON
+        return o.tolist()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _compress(body: bytes, encoding: str | None) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6, mtime=0)  # mtime=0: same bytes, same ETag
+    return body
+
+
+def accepted_encoding() -> str | None:
+    """Best Content-Encoding the client accepts ("br", "gzip") or None."""
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return request.accept_encodings.best_match(offered)
+
+
+def encode(payload, mimetype: str = JSON, pack=None, encoding: str | None = None) -> Encoded:
+    body = pack(payload) if pack else json.dumps(payload, separators=(",", ":"), default=_default).encode()
+    if len(body) < COMPRESS_MIN_BYTES:
+        encoding = None
+    body = _compress(body, encoding)
+    return Encoded(body, hashlib.blake2b(body, digest_size=16).hexdigest(), mimetype, encoding)
+
+
+def cached(key, version, build, **encode_kw) -> Encoded:
+    """Encoded build() for key at `version`; rebuilt only when the version moves (or is None).
+
+    Representations (mimetype, encoding) are separate entries: put them in the key."""
+    if version is None:
+        return encode(build(), **encode_kw)
+    hit = _RESPONSES.get(key)
+    if hit is not None and hit[0] == version:
+        return hit[1]
+    enc = encode(build(), **encode_kw)
+    _RESPONSES.set(key, (version, enc), ttl=RESPONSE_TTL)
+    return enc
+
+
+def respond(enc: Encoded, status: int = 200, vary: str | None = None) -> Response:
+    headers = {"ETag": f'"{enc.etag}"', "Cache-Control": "no-cache"}
+    if vary:
+        headers["Vary"] = vary
+    if status == 200 and request.if_none_match.contains_weak(enc.etag):
+        return Response(status=304, headers=headers)
+    if enc.encoding:
+        headers["Content-Encoding"] = enc.encoding
+    return Response(enc.body, status=status, headers=headers, mimetype=enc.mimetype)
+
+
+# ---------- versions ----------
+def stamp() -> int:
+    return next(_stamps)
+
+
+def version(name: str):
+    """Shared version counter for `name`, or None if it can't be read (don't serve cached bytes)."""
+    try:
+        doc = versions.find_one({"_id": name})
+    except PyMongoError:
+        return None
+    return doc["v"] if doc else 0
+
+
+def bump(name: str):
+    try:
+        versions.update_one({"_id": name}, {"$inc": {"v": 1}}, upsert=True)
+    except PyMongoError:
+        pass
@@ -0,0 +1,50 @@
+"""
+Time-decayed "hot" score for threads.
+
+hotness = sign(s) * log10(max(|s|, 1)) + age_offset, where s is the net vote
+count plus weighted comments and age_offset is the creation time in units of
+HOT_DECAY_SECONDS. Newer threads start higher, and every HOT_DECAY_SECONDS of
+age costs as much as a 10x change in s. The value only changes when votes or
+comments do, so it is stored on the thread (recomputed inside the same update
+that moves the counters) and indexed, instead of being computed per request.
+"""
+import math, os
+from datetime import datetime, timezone
+from core import encoded, scheduler
+from core.db import threads
+
+DECAY_SECONDS = float(os.getenv("HOT_DECAY_SECONDS", "45000"))
+COMMENT_WEIGHT = float(os.getenv("HOT_COMMENT_WEIGHT", "0.5"))
+_EPOCH = datetime(2024, 1, 1)  # naive UTC, like stored createdAt values
+
+
+def score(up: int, down: int, comment_count: int, created_at: datetime) -> float:
+    s = up - down + COMMENT_WEIGHT * comment_count
+    sign = (s > 0) - (s < 0)
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return sign * math.log10(max(abs(s), 1)) + (created_at - _EPOCH).total_seconds() / DECAY_SECONDS
+
+
+def expr() -> dict:
+    """score() as an aggregation expression over the thread's own fields."""
+    s = {"$add": [
+        {"$subtract": [{"$ifNull": ["$up", 0]}, {"$ifNull": ["$down", 0]}]},
+        {"$multiply": [COMMENT_WEIGHT, {"$ifNull": ["$commentCount", 0]}]},
+    ]}
+    return {"$let": {"vars": {"s": s}, "in": {"$add": [
+        {"$multiply": [
+            {"$cond": [{"$gt": ["$$s", 0]}, 1, {"$cond": [{"$lt": ["$$s", 0]}, -1, 0]}]},
+            {"$log10": {"$max": [{"$abs": "$$s"}, 1]}},
+        ]},
+        {"$divide": [{"$subtract": ["$createdAt", _EPOCH]}, DECAY_SECONDS * 1000]},
+    ]}}}
+
+
+def backfill():
+    """Score threads created before hotness existed."""
+    if threads.update_many({"hotness": {"$exists": False}}, [{"$set": {"hotness": expr()}}]).modified_count:
+        encoded.bump("community")
+
+
+scheduler.submit(("hotness", "backfill"), backfill)
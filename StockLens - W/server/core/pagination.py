@@ -0,0 +1,60 @@
+"""
+Keyset (cursor) pagination.
+
+Each page continues from the sort-key values of the previous page's last row
+with a range filter on the same index, so page N costs the same index walk as
+page 1 (no skip). The sort always ends in _id to break ties. Cursors are those
+values encoded with bson.json_util and base64url'd, so they're opaque to the
+client.
+"""
+import base64, binascii
+from bson import json_util
+
+
+def encode(values: list) -> str:
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode(cursor: str) -> list:
+    """Sort-key values from a cursor; ValueError if it wasn't one of ours."""
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise ValueError("invalid cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("invalid cursor")
+    return values
+
+
+def after(sort: list, values: list) -> dict:
+    """Filter for rows strictly after `values` in `sort` order ([(field, 1|-1), ...]).
+
+    A missing field (e.g. hotness before the backfill) sorts as null, below every
+    value, but $gt/$lt never match across null: those rows get their own clauses."""
+    if len(values) != len(sort):
+        raise ValueError("invalid cursor")
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        prefix = {f: v for (f, _), v in zip(sort[:i], values[:i])}
+        v = values[i]
+        if v is None:
+            if direction == 1:  # nulls first: every value follows
+                clauses.append({**prefix, field: {"$ne": None}})
+            continue  # descending: nothing sorts below null
+        clauses.append({**prefix, field: {"$gt" if direction == 1 else "$lt": v}})
+        if direction == -1:
+            clauses.append({**prefix, field: None})
+    return {"$or": clauses}
+
+
+def page(coll, query: dict, sort: list, limit: int, cursor: str | None = None, projection: dict | None = None):
+    """One page of `coll` in `sort` order. Returns (docs, next_cursor or None)."""
+    if cursor:
+        query = {"$and": [query, after(sort, decode(cursor))]} if query else after(sort, decode(cursor))
+    if projection is not None:
+        projection = {**projection, **{f: 1 for f, _ in sort}}
+    docs = list(coll.find(query, projection).sort(sort).limit(limit + 1))
+    if len(docs) <= limit:
+        return docs, None
+    docs = docs[:limit]
+    return docs, encode([docs[-1].get(f) for f, _ in sort])
@@ -0,0 +1,167 @@
+"""
+Token-bucket rate limiting shared by every worker process.
+
+Each bucket is one document in `ratelimits`; a findOneAndUpdate pipeline
+refills and spends tokens atomically on the Mongo clock, so all workers share
+one provider quota (falls back to an in-process bucket if Mongo is down or
+RATE_LIMIT_BACKEND=local). Background calls must leave `reserve` tokens
+behind, so interactive calls always get ahead of refresh jobs. Admission
+never blocks for long: callers get "wait N ms" / RateLimited and can serve
+cached data instead.
+"""
+import asyncio, math, os, threading, time
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+from core.db import ratelimits
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+PRIORITIES = (INTERACTIVE, BACKGROUND)
+
+BACKEND = os.getenv("RATE_LIMIT_BACKEND", "mongo").strip().lower()
+
+
+class RateLimited(Exception):
+    def __init__(self, bucket: str, wait_ms: int):
+        super().__init__(f"{bucket} rate limited, retry in {wait_ms} ms")
+        self.bucket = bucket
+        self.wait_ms = int(wait_ms)
+
+
+class Bucket:
+    def __init__(self, name: str, rate: float, burst: int, reserve: int = 0):
+        self.name = name
+        self.rate = float(rate)        # tokens per second
+        self.burst = float(burst)      # bucket capacity
+        self.reserve = float(min(reserve, max(0, burst - 1)))  # left behind by background calls
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._ts = time.time()
+        self._counters = {p: {"queued": 0, "admitted": 0, "rejected": 0} for p in PRIORITIES}
+
+    # ----- token accounting -----
+    def _need(self, priority: str) -> float:
+        return 1.0 + (self.reserve if priority == BACKGROUND else 0.0)
+
+    def _take_mongo(self, need: float):
+        now = {"$divide": [{"$toLong": "$$NOW"}, 1000]}
+        elapsed = {"$max": [0, {"$subtract": [now, {"$ifNull": ["$ts", now]}]}]}
+        doc = ratelimits.find_one_and_update(
+            {"_id": self.name},
+            [
+                {"$set": {
+                    "tokens": {"$min": [self.burst, {"$add": [
+                        {"$ifNull": ["$tokens", self.burst]},
+                        {"$multiply": [elapsed, self.rate]},
+                    ]}]},
+                    "ts": now,
+                }},
+                {"$set": {"admitted": {"$gte": ["$tokens", need]}}},
+                {"$set": {"tokens": {"$cond": ["$admitted", {"$subtract": ["$tokens", 1]}, "$tokens"]}}},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return bool(doc["admitted"]), float(doc["tokens"])
+
+    def _take_local(self, need: float):
+        with self._lock:
+            now = time.time()
+            self._tokens = min(self.burst, self._tokens + max(0.0, now - self._ts) * self.rate)
+            self._ts = now
+            admitted = self._tokens >= need
+            if admitted:
+                self._tokens -= 1
+            return admitted, self._tokens
+
+    def _take(self, need: float):
+        if BACKEND == "mongo":
+            try:
+                return self._take_mongo(need)
+            except PyMongoError:
+                pass
+        return self._take_local(need)
+
+    # ----- admission -----
+    def try_acquire(self, priority: str = INTERACTIVE) -> int:
+        """Spend a token if one is available. Returns 0 when admitted, else ms to wait."""
+        need = self._need(priority)
+        admitted, tokens = self._take(need)
+        if admitted:
+            return 0
+        if self.rate <= 0:
+            return 60_000
+        return max(1, math.ceil((need - tokens) / self.rate * 1000))
+
+    def acquire(self, priority: str = INTERACTIVE, max_wait_ms: int | None = None):
+        """Wait up to max_wait_ms for a token, otherwise raise RateLimited."""
+        if max_wait_ms is None:
+            max_wait_ms = INTERACTIVE_MAX_WAIT_MS if priority == INTERACTIVE else BACKGROUND_MAX_WAIT_MS
+        deadline = time.monotonic() + max_wait_ms / 1000.0
+        queued = False
+        while True:
+            wait_ms = self.try_acquire(priority)
+            if wait_ms == 0:
+                self._count(priority, "admitted")
+                return
+            left_ms = (deadline - time.monotonic()) * 1000
+            if wait_ms > left_ms:
+                self._count(priority, "rejected")
+                raise RateLimited(self.name, wait_ms)
+            if not queued:
+                self._count(priority, "queued")
+                queued = True
+            time.sleep(wait_ms / 1000.0)
+
+    async def aacquire(self, priority: str = INTERACTIVE, max_wait_ms: int | None = None):
+        """acquire() for coroutines: waits with asyncio.sleep instead of blocking a thread."""
+        if max_wait_ms is None:
+            max_wait_ms = INTERACTIVE_MAX_WAIT_MS if priority == INTERACTIVE else BACKGROUND_MAX_WAIT_MS
+        deadline = time.monotonic() + max_wait_ms / 1000.0
+        queued = False
+        while True:
+            wait_ms = await asyncio.to_thread(self.try_acquire, priority)
+            if wait_ms == 0:
+                self._count(priority, "admitted")
+                return
+            left_ms = (deadline - time.monotonic()) * 1000
+            if wait_ms > left_ms:
+                self._count(priority, "rejected")
+                raise RateLimited(self.name, wait_ms)
+            if not queued:
+                self._count(priority, "queued")
+                queued = True
+            await asyncio.sleep(wait_ms / 1000.0)
+
+    def _count(self, priority: str, key: str):
+        with self._lock:
+            self._counters[priority][key] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = {p: dict(c) for p, c in self._counters.items()}
+        return {
+            "rate": self.rate, "burst": self.burst, "reserve": self.reserve,
+            "backend": BACKEND,
+            **counters,
+        }
+
+
+# ---------- provider buckets (override with env) ----------
+_FINN_MIN_GAP = float(os.getenv("FINN_MIN_GAP", "0.40"))  # seconds per token
+INTERACTIVE_MAX_WAIT_MS = int(os.getenv("RATE_LIMIT_MAX_WAIT_MS", "1500"))
+# background jobs run off the request path, so they can afford to queue
+BACKGROUND_MAX_WAIT_MS = int(os.getenv("RATE_LIMIT_BG_MAX_WAIT_MS", "5000"))
+
+finnhub = Bucket(
+    "finnhub",
+    rate=(1.0 / _FINN_MIN_GAP) if _FINN_MIN_GAP > 0 else 1000.0,
+    burst=max(1, int(os.getenv("FINN_BURST", "30"))),
+    reserve=int(os.getenv("FINN_BG_RESERVE", "10")),
+)
+
+BUCKETS = {b.name: b for b in (finnhub,)}
+
+
+def stats() -> dict:
+    return {name: b.stats() for name, b in BUCKETS.items()}
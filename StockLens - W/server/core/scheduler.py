@@ -0,0 +1,111 @@
+"""
+Background refresh scheduler (one per worker process).
+
+submit() queues a refresh job, deduplicated by key, for a small pool of
+daemon threads, which lets endpoints serve a stale cache entry right away
+and refresh it off the request path. at() registers a recurring job that
+fires at a computed timestamp, e.g. the next NYSE close boundary. touch() /
+popular() keep decayed request counts so warm-up jobs know which keys matter.
+"""
+import os, queue, threading, time
+from collections import Counter
+
+WORKERS = int(os.getenv("SCHEDULER_WORKERS", "2"))
+
+_lock = threading.Lock()
+_queue: queue.Queue = queue.Queue()
+_pending: set = set()
+_timed: list = []  # [next_ts, name, next_ts_fn, fn]
+_hits: dict = {}   # kind -> Counter
+_stats = {"submitted": 0, "deduped": 0, "completed": 0, "failed": 0, "timedRuns": 0}
+_started_pid = None
+
+
+def submit(key, fn) -> bool:
+    """Queue fn() unless a job with the same key is already pending. Returns True if queued."""
+    _ensure_started()
+    with _lock:
+        if key in _pending:
+            _stats["deduped"] += 1
+            return False
+        _pending.add(key)
+        _stats["submitted"] += 1
+    _queue.put((key, fn))
+    return True
+
+
+def at(name: str, next_ts_fn, fn):
+    """Run fn() in the background at next_ts_fn() (unix ts), then reschedule."""
+    with _lock:
+        _timed.append([float(next_ts_fn()), name, next_ts_fn, fn])
+
+
+# ---------- popularity ----------
+def touch(kind: str, key):
+    _ensure_started()
+    with _lock:
+        _hits.setdefault(kind, Counter())[key] += 1
+
+
+def popular(kind: str, n: int) -> list:
+    with _lock:
+        return [k for k, _ in (_hits.get(kind) or Counter()).most_common(n)]
+
+
+def decay(kind: str):
+    """Halve request counts so popularity follows recent traffic."""
+    with _lock:
+        c = _hits.get(kind)
+        if c:
+            _hits[kind] = Counter({k: v // 2 for k, v in c.items() if v > 1})
+
+
+# ---------- threads ----------
+def _work():
+    while True:
+        key, fn = _queue.get()
+        try:
+            fn()
+            ok = True
+        except Exception:
+            ok = False
+        with _lock:
+            _pending.discard(key)
+            _stats["completed" if ok else "failed"] += 1
+
+
+def _tick():
+    while True:
+        now = time.time()
+        due = []
+        with _lock:
+            for job in _timed:
+                if job[0] <= now:
+                    due.append(job)
+                    nxt = float(job[2]())
+                    job[0] = nxt if nxt > now else now + 60
+            wait = min([j[0] for j in _timed], default=now + 30) - now
+        for _, name, _, fn in due:
+            with _lock:
+                _stats["timedRuns"] += 1
+            submit(("timed", name), fn)
+        time.sleep(max(0.5, min(wait, 30)))
+
+
+def _ensure_started():
+    # threads don't survive fork: start them lazily in each worker
+    global _started_pid
+    if _started_pid == os.getpid():
+        return
+    with _lock:
+        if _started_pid == os.getpid():
+            return
+        for i in range(max(1, WORKERS)):
+            threading.Thread(target=_work, name=f"refresh-{i}", daemon=True).start()
+        threading.Thread(target=_tick, name="refresh-timer", daemon=True).start()
+        _started_pid = os.getpid()
+
+
+def stats() -> dict:
+    with _lock:
+        return {**_stats, "pending": len(_pending), "timed": [j[1] for j in _timed]}
@@ -0,0 +1,165 @@
+"""
+Single-flight coalescing for upstream cache misses.
+
+Concurrent callers asking for the same key in one process wait on the first
+caller's upstream call and share its result (or exception). With `lease_ttl`
+the leader also holds a lease document in Mongo; a worker that finds the lease
+taken waits for it to be released and then calls `reread()` to pick up what
+the other worker stored, only going upstream itself if that returns None.
+
+ado() is do() for coroutines on the worker's event loop (services/aio.py). It
+shares the same in-flight calls, so a sync request and an async one for the
+same key still make one upstream call; async callers await instead of
+blocking the loop.
+"""
+import asyncio, os, socket, threading, time
+from datetime import timedelta
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from core.db import leases
+from core.utils import utcnow
+
+LEASE_POLL = float(os.getenv("SINGLEFLIGHT_LEASE_POLL", "0.05"))  # seconds
+
+_OWNER = f"{socket.gethostname()}:{os.getpid()}"
+_lock = threading.Lock()
+_inflight: dict = {}
+_stats = {"leaders": 0, "coalesced": 0, "leaseWaits": 0, "leaseRereads": 0}
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "futures")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.futures = []  # asyncio futures of ado() callers waiting on this call
+
+
+def _join(key):
+    """(call, leader): the in-flight call for key, or a new one this caller leads."""
+    with _lock:
+        call = _inflight.get(key)
+        leader = call is None
+        if leader:
+            call = _inflight[key] = _Call()
+            _stats["leaders"] += 1
+        else:
+            _stats["coalesced"] += 1
+        return call, leader
+
+
+def _resolve(fut, call: _Call):
+    if not fut.done():
+        if call.error is not None:
+            fut.set_exception(call.error)
+        else:
+            fut.set_result(call.result)
+
+
+def _finish(key, call: _Call):
+    with _lock:  # ado() checks the event and registers futures under the same lock
+        _inflight.pop(key, None)
+        call.event.set()
+        futures = list(call.futures)
+    for fut in futures:
+        fut.get_loop().call_soon_threadsafe(_resolve, fut, call)
+
+
+def _count(key: str):
+    with _lock:
+        _stats[key] += 1
+
+
+def do(key, fn, lease_ttl: float | None = None, reread=None):
+    """Run fn() once per key across concurrent callers and return its result."""
+    call, leader = _join(key)
+    if not leader:
+        call.event.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    try:
+        call.result = _leased(key, fn, lease_ttl, reread) if lease_ttl else fn()
+        return call.result
+    except BaseException as e:
+        call.error = e
+        raise
+    finally:
+        _finish(key, call)
+
+
+async def ado(key, coro_fn):
+    """do() for coroutines: await coro_fn() once per key, across sync and async callers."""
+    call, leader = _join(key)
+    if not leader:
+        fut = asyncio.get_running_loop().create_future()
+        with _lock:
+            done = call.event.is_set()
+            if not done:
+                call.futures.append(fut)
+        if done:
+            _resolve(fut, call)
+        return await fut
+    try:
+        call.result = await coro_fn()
+        return call.result
+    except BaseException as e:
+        call.error = e
+        raise
+    finally:
+        _finish(key, call)
+
+
+# ---------- cross-worker leases ----------
+def _lease_id(key) -> str:
+    return "|".join(str(k) for k in key) if isinstance(key, tuple) else str(key)
+
+
+def _try_lease(lid: str, ttl: float) -> bool:
+    now = utcnow()
+    doc = {"_id": lid, "owner": _OWNER, "expiresAt": now + timedelta(seconds=ttl)}
+    try:
+        leases.insert_one(doc)
+        return True
+    except DuplicateKeyError:
+        # take over a lease whose holder died without releasing it
+        res = leases.update_one({"_id": lid, "expiresAt": {"$lte": now}}, {"$set": doc})
+        return res.modified_count == 1
+
+
+def _leased(key, fn, ttl: float, reread):
+    lid = _lease_id(key)
+    try:
+        owned = _try_lease(lid, ttl)
+    except PyMongoError:
+        return fn()
+    if owned:
+        try:
+            return fn()
+        finally:
+            try:
+                leases.delete_one({"_id": lid, "owner": _OWNER})
+            except PyMongoError:
+                pass
+
+    # another worker is fetching: wait for it, then reuse what it stored
+    _count("leaseWaits")
+    deadline = time.monotonic() + ttl
+    try:
+        while time.monotonic() < deadline and leases.find_one({"_id": lid, "expiresAt": {"$gt": utcnow()}}, {"_id": 1}):
+            time.sleep(LEASE_POLL)
+    except PyMongoError:
+        pass
+    if reread is not None:
+        result = reread()
+        if result is not None:
+            _count("leaseRereads")
+            return result
+    return fn()
+
+
+def stats() -> dict:
+    with _lock:
+        return {**_stats, "inflight": len(_inflight)}
@@ -0,0 +1,147 @@
+"""
+Materialized per-symbol community score (`symbol_stats` collection).
+
+One document per symbol holds the thread count `n` and the `top` threads in
+reliability order ({id, r: reliabilityScore, s: stance as -1/0/1}), capped at
+SYMBOL_STATS_TOP_CAP. Thread creation and re-scoring update it incrementally
+with a single pipeline update, which also recomputes the score: the mean
+stance of the top k = max(3, 10% of n) threads. Reading the score is then one
+_id lookup instead of loading and sorting every thread of the symbol.
+
+The stored `top` is always an exact prefix of the symbol's threads ordered by
+(reliability desc, _id asc). A thread that drops below the stored tail of a
+capped list is removed rather than guessed at; if the prefix gets shorter
+than k the document is marked not `ok` and the next read rebuilds it from
+the threads index. repair_all() rebuilds every symbol periodically as a
+backstop for writes that failed after the thread itself was saved.
+"""
+import os, time
+from pymongo import ReplaceOne
+from pymongo.errors import PyMongoError
+from core import scheduler
+from core.db import symbol_stats, threads
+from core.utils import utcnow
+
+TOP_CAP = int(os.getenv("SYMBOL_STATS_TOP_CAP", "500"))
+REPAIR_INTERVAL = float(os.getenv("SYMBOL_STATS_REPAIR_INTERVAL", "21600"))  # seconds
+
+_STANCE = {"buy": 1, "sell": -1}
+_PROJECTION = {"n": 1, "k": 1, "score": 1, "ok": 1}
+
+
+def stance_value(stance) -> int:
+    return _STANCE.get(stance, 0)
+
+
+def _k(n: int) -> int:
+    return min(max(3, int(n * 0.1)), n, TOP_CAP)
+
+
+# ---------- incremental updates ----------
+def _apply(symbol: str, tid, r: float, s: int, inc: int):
+    """Insert or move thread `tid` in the symbol's top list and recompute its score."""
+    entry = {"id": tid, "r": float(r), "s": int(s)}
+    top = {"$ifNull": ["$top", []]}
+    n_old = {"$ifNull": ["$n", 0]}
+    # x ranks ahead of `last` in (r desc, id asc) order
+    ahead_of_last = {"$let": {"vars": {"last": {"$last": "$_rest"}}, "in": {"$or": [
+        {"$gt": [entry["r"], "$$last.r"]},
+        {"$and": [{"$eq": [entry["r"], "$$last.r"]}, {"$lt": [tid, "$$last.id"]}]},
+    ]}}}
+    pipeline = [
+        {"$set": {
+            "_complete": {"$eq": [{"$size": top}, n_old]},
+            "_rest": {"$filter": {"input": top, "cond": {"$ne": ["$$this.id", tid]}}},
+            "n": {"$add": [n_old, inc]},
+        }},
+        # keep the entry if every thread is stored, or if it still lands inside the stored prefix
+        {"$set": {"top": {"$cond": [
+            {"$or": ["$_complete", {"$and": [{"$gt": [{"$size": "$_rest"}, 0]}, ahead_of_last]}]},
+            {"$slice": [{"$sortArray": {"input": {"$concatArrays": ["$_rest", [entry]]},
+                                        "sortBy": {"r": -1, "id": 1}}}, TOP_CAP]},
+            "$_rest",
+        ]}}},
+        {"$set": {"k": {"$min": [{"$max": [3, {"$toInt": {"$floor": {"$multiply": ["$n", 0.1]}}}]}, "$n", TOP_CAP]}}},
+        {"$set": {
+            "ok": {"$gte": [{"$size": "$top"}, "$k"]},
+            "score": {"$cond": [
+                {"$gt": ["$k", 0]},
+                {"$divide": [{"$sum": {"$slice": ["$top.s", {"$max": ["$k", 1]}]}}, "$k"]},
+                0.0,
+            ]},
+            "updatedAt": "$$NOW",
+        }},
+        {"$unset": ["_complete", "_rest"]},
+    ]
+    try:
+        symbol_stats.update_one({"_id": symbol}, pipeline, upsert=True)
+    except PyMongoError:
+        pass  # the thread write already succeeded; the repair job catches up
+
+
+def thread_added(thread: dict):
+    _apply(thread["symbol"], thread["_id"], thread.get("reliabilityScore") or 0.0,
+           stance_value(thread.get("stance")), inc=1)
+
+
+def thread_scored(thread: dict):
+    _apply(thread["symbol"], thread["_id"], thread.get("reliabilityScore") or 0.0,
+           stance_value(thread.get("stance")), inc=0)
+
+
+# ---------- reads / repair ----------
+_EMPTY = {"n": 0, "k": 0, "score": 0.0}
+REPAIR_BATCH = 200
+
+
+def _doc(n: int, top: list) -> dict:
+    k = _k(n)
+    return {"n": n, "top": top, "k": k, "ok": len(top) >= k,
+            "score": sum(e["s"] for e in top[:k]) / k if k else 0.0, "updatedAt": utcnow()}
+
+
+def recompute_many(symbols: list) -> dict:
+    """Rebuild the documents of `symbols` from their threads with one aggregation and
+    one bulk write. Symbols without threads get no document (they read as empty)."""
+    rows = threads.aggregate([
+        {"$match": {"symbol": {"$in": list(symbols)}}},
+        {"$group": {
+            "_id": "$symbol",
+            "n": {"$sum": 1},
+            "top": {"$topN": {"n": TOP_CAP, "sortBy": {"reliabilityScore": -1, "_id": 1},
+                              "output": {"id": "$_id", "r": "$reliabilityScore", "stance": "$stance"}}},
+        }},
+    ])
+    out = {}
+    for row in rows:
+        top = [{"id": e["id"], "r": float(e.get("r") or 0.0), "s": stance_value(e.get("stance"))}
+               for e in row["top"]]
+        out[row["_id"]] = _doc(row["n"], top)
+    if out:
+        symbol_stats.bulk_write([ReplaceOne({"_id": s}, d, upsert=True) for s, d in out.items()],
+                                ordered=False)
+    return out
+
+
+def get_many(symbols: list) -> dict:
+    """symbol -> {n, k, score} read from the materialized documents, rebuilding missing ones."""
+    out = {d["_id"]: d for d in symbol_stats.find({"_id": {"$in": list(symbols)}}, _PROJECTION)}
+    stale = [s for s in symbols if not out.get(s, {}).get("ok", False)]
+    if stale:
+        out.update(recompute_many(stale))
+    return {s: {"n": out[s]["n"], "k": out[s]["k"], "score": float(out[s]["score"])} if s in out else dict(_EMPTY)
+            for s in symbols}
+
+
+def get(symbol: str) -> dict:
+    return get_many([symbol])[symbol]
+
+
+def repair_all():
+    """Full recompute for every symbol with threads."""
+    symbols = threads.distinct("symbol")
+    for i in range(0, len(symbols), REPAIR_BATCH):
+        recompute_many(symbols[i:i + REPAIR_BATCH])
+
+
+scheduler.at("symbol-stats-repair", lambda: time.time() + REPAIR_INTERVAL, repair_all)
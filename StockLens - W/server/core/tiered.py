@@ -0,0 +1,112 @@
+"""
+Two-tier cache for slow-changing upstream data (profiles, fundamentals).
+
+L1 is the worker's LRUCache; L2 is the `tiered_cache` collection shared by
+all workers. A read checks L1, then L2 (promoting the hit into L1), and only
+then goes upstream: under a cross-worker singleflight lease, so N workers
+missing the same key make one upstream call and the rest reread it from L2.
+Each TieredCache carries its own freshness policy: entries are fresh for
+`ttl` (or until `until()`, e.g. the next market close), then served stale for up to `stale_ttl` while the scheduler refreshes
+them at background priority. L2 documents expire through a TTL index once
+the stale window is over.
+"""
+import os, threading, time
+from datetime import datetime, timezone
+from pymongo.errors import PyMongoError
+from core import ratelimit, scheduler, singleflight
+from core.cache import LRUCache
+from core.db import tiered_cache
+
+LEASE_TTL = float(os.getenv("TIERED_LEASE_TTL", "15"))  # seconds another worker waits on a fetch
+
+_TIERS: list = []
+
+
+def _utc(ts: float) -> datetime:
+    # naive UTC, like the rest of the stored dates
+    return datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=None)
+
+
+class TieredCache:
+    def __init__(self, name: str, ttl: float, stale_ttl: float, max_bytes: int, until=None):
+        self.name = name
+        self.ttl = float(ttl)
+        self.until = until
+        self.stale_ttl = float(stale_ttl)
+        self._l1 = LRUCache(name, max_bytes, stale_ttl=stale_ttl)
+        self._lock = threading.Lock()
+        self._stats = {"l2Hits": 0, "l2Misses": 0, "fetches": 0, "l2Errors": 0}
+        _TIERS.append(self)
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _id(self, key) -> str:
+        return f"{self.name}:{key}"
+
+    def _l2_get(self, key):
+        """(value, valid_until) from Mongo, or (None, 0)."""
+        try:
+            doc = tiered_cache.find_one({"_id": self._id(key)}, {"value": 1, "validUntil": 1})
+        except PyMongoError:
+            self._count("l2Errors")
+            return None, 0
+        if not doc:
+            self._count("l2Misses")
+            return None, 0
+        self._count("l2Hits")
+        valid_until = doc["validUntil"].replace(tzinfo=timezone.utc).timestamp()
+        self._l1.set(key, doc["value"], valid_until=valid_until)
+        return doc["value"], valid_until
+
+    def put(self, key, value):
+        valid_until = self.until() if self.until else time.time() + self.ttl
+        self._l1.set(key, value, valid_until=valid_until)
+        try:
+            tiered_cache.replace_one({"_id": self._id(key)}, {
+                "value": value,
+                "validUntil": _utc(valid_until),
+                "expiresAt": _utc(valid_until + self.stale_ttl),
+            }, upsert=True)
+        except PyMongoError:
+            self._count("l2Errors")  # L1 still has it; other workers fetch their own
+        return value
+
+    def lookup(self, key):
+        """(value, fresh) from L1, then L2; (None, False) on a miss in both."""
+        value, fresh = self._l1.lookup(key)
+        if value is not None:
+            return value, fresh
+        value, valid_until = self._l2_get(key)
+        if value is None or valid_until + self.stale_ttl <= time.time():
+            return None, False
+        return value, valid_until > time.time()
+
+    def _fetch(self, key, fetch, priority):
+        def upstream():
+            self._count("fetches")
+            return self.put(key, fetch(priority))
+
+        def reread():
+            value, valid_until = self._l2_get(key)
+            return value if valid_until > time.time() else None
+
+        return singleflight.do((self.name, key), upstream, lease_ttl=LEASE_TTL, reread=reread)
+
+    def get(self, key, fetch):
+        """Cached value for key; on a miss (in both tiers) returns fetch(priority) and stores it."""
+        value, fresh = self.lookup(key)
+        if value is None:
+            return self._fetch(key, fetch, ratelimit.INTERACTIVE)
+        if not fresh:
+            scheduler.submit((self.name, key), lambda: self._fetch(key, fetch, ratelimit.BACKGROUND))
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "ttl": self.ttl, "staleTtl": self.stale_ttl}
+
+
+def stats() -> dict:
+    return {t.name: t.stats() for t in _TIERS}
@@ -0,0 +1,178 @@
+"""
+NYSE trading calendar.
+
+The session table (one (open, close) unix-ts pair per trading day) is built
+once at import for the surrounding years from the exchange's holiday rules:
+weekends, the ten NYSE holidays with their weekend observance, and the 1 PM
+early closes (July 3rd, the day after Thanksgiving, Christmas Eve). Closures
+the rules can't know about (days of mourning, weather) go in
+MARKET_CLOSED_DATES=YYYY-MM-DD,...
+
+Cache policies use it so market data expires at real session boundaries:
+next_settle() is the next close plus SETTLE_SECONDS for the closing prints to
+land, and valid_until() gives live data its TTL only while a session is
+running, holding it until the next open otherwise.
+"""
+import os, threading, time
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta, timezone
+try:
+    from zoneinfo import ZoneInfo
+    _NY = ZoneInfo("America/New_York")
+except Exception:  # no tz database: US DST rules below
+    _NY = None
+
+SETTLE_SECONDS = int(os.getenv("MARKET_SETTLE_SECONDS", "600"))
+YEARS_AHEAD = 2
+EXTRA_CLOSED = {date.fromisoformat(d.strip()) for d in os.getenv("MARKET_CLOSED_DATES", "").split(",") if d.strip()}
+
+_OPEN, _CLOSE, _EARLY_CLOSE = (9, 30), (16, 0), (13, 0)
+
+
+# ---------- holiday rules ----------
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th (1-based; -1 = last) given weekday (Mon=0) of the month."""
+    if n > 0:
+        d = date(year, month, 1)
+        return d + timedelta(days=(weekday - d.weekday()) % 7 + 7 * (n - 1))
+    d = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return d - timedelta(days=(d.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    # anonymous Gregorian algorithm
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l) // 433
+    month = (h + l - 7 * m + 90) // 25
+    return date(year, month, (h + l - 7 * m + 33 * month + 19) % 32)
+
+
+def _observed(d: date) -> date:
+    # Saturday holidays move to Friday, Sunday holidays to Monday
+    return d - timedelta(days=1) if d.weekday() == 5 else d + timedelta(days=1) if d.weekday() == 6 else d
+
+
+def holidays(year: int) -> set:
+    days = {
+        _nth_weekday(year, 1, 0, 3),              # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),              # Washington's Birthday
+        _easter(year) - timedelta(days=2),        # Good Friday
+        _nth_weekday(year, 5, 0, -1),             # Memorial Day
+        _observed(date(year, 7, 4)),              # Independence Day
+        _nth_weekday(year, 9, 0, 1),              # Labor Day
+        _nth_weekday(year, 11, 3, 4),             # Thanksgiving
+        _observed(date(year, 12, 25)),            # Christmas
+    }
+    if date(year, 1, 1).weekday() != 5:           # a Saturday New Year's Day isn't observed on Dec 31
+        days.add(_observed(date(year, 1, 1)))
+    if year >= 2022:
+        days.add(_observed(date(year, 6, 19)))    # Juneteenth
+    return days
+
+
+def early_closes(year: int) -> set:
+    days = {_nth_weekday(year, 11, 3, 4) + timedelta(days=1)}  # day after Thanksgiving
+    # July 3rd and Christmas Eve close early when the holiday itself falls Tuesday-Friday
+    # (on a Friday they are the observed holiday, on a weekend there's no session)
+    days.update(d for d in (date(year, 7, 3), date(year, 12, 24)) if d.weekday() < 4)
+    return days
+
+
+# ---------- timezone ----------
+def _us_dst(d: datetime) -> bool:
+    # second Sunday of March 2:00 to first Sunday of November 2:00, local time
+    start = datetime.combine(_nth_weekday(d.year, 3, 6, 2), datetime.min.time()) + timedelta(hours=2)
+    end = datetime.combine(_nth_weekday(d.year, 11, 6, 1), datetime.min.time()) + timedelta(hours=2)
+    return start <= d < end
+
+
+def _ny_ts(day: date, hm: tuple) -> int:
+    local = datetime(day.year, day.month, day.day, *hm)
+    if _NY is not None:
+        return int(local.replace(tzinfo=_NY).timestamp())
+    offset = 4 if _us_dst(local) else 5
+    return int((local + timedelta(hours=offset)).replace(tzinfo=timezone.utc).timestamp())
+
+
+# ---------- session table ----------
+_lock = threading.Lock()
+_years = (0, -1)          # first, last year in the table
+_opens: list = []
+_closes: list = []
+
+
+def _build(first: int, last: int):
+    global _years, _opens, _closes
+    opens, closes = [], []
+    for year in range(first, last + 1):
+        closed, early = holidays(year) | EXTRA_CLOSED, early_closes(year)
+        d = date(year, 1, 1)
+        while d.year == year:
+            if d.weekday() < 5 and d not in closed:
+                opens.append(_ny_ts(d, _OPEN))
+                closes.append(_ny_ts(d, _EARLY_CLOSE if d in early else _CLOSE))
+            d += timedelta(days=1)
+    _years, _opens, _closes = (first, last), opens, closes
+
+
+def _table(ts: float):
+    """(opens, closes) covering ts, extending the table if a long-lived worker runs past it."""
+    year = datetime.fromtimestamp(ts, timezone.utc).year
+    if not (_years[0] <= year - 1 and year + 1 <= _years[1]):
+        with _lock:
+            if not (_years[0] <= year - 1 and year + 1 <= _years[1]):
+                _build(min(_years[0], year - 1) if _opens else year - 1, max(_years[1], year + YEARS_AHEAD))
+    return _opens, _closes
+
+
+def is_open(ts: float | None = None) -> bool:
+    ts = time.time() if ts is None else ts
+    opens, closes = _table(ts)
+    i = bisect_right(opens, ts) - 1
+    return i >= 0 and ts < closes[i]
+
+
+def next_open(ts: float | None = None) -> int:
+    """Start of the first session opening after ts."""
+    ts = time.time() if ts is None else ts
+    opens, _ = _table(ts)
+    i = bisect_right(opens, ts)
+    return opens[i] if i < len(opens) else next_open(opens[-1] + 86400)
+
+
+def next_close(ts: float | None = None) -> int:
+    """End of the session running at ts, or of the next one."""
+    ts = time.time() if ts is None else ts
+    _, closes = _table(ts)
+    i = bisect_right(closes, ts)
+    return closes[i] if i < len(closes) else next_close(closes[-1] + 1)
+
+
+def next_settle(ts: float | None = None) -> int:
+    """First close + SETTLE_SECONDS after ts: when a trading day's bars are final."""
+    ts = time.time() if ts is None else ts
+    return next_close(ts - SETTLE_SECONDS) + SETTLE_SECONDS
+
+
+def last_close(ts: float | None = None) -> int:
+    ts = time.time() if ts is None else ts
+    _, closes = _table(ts)
+    i = bisect_left(closes, ts) - 1
+    return closes[i] if i >= 0 else 0
+
+
+def valid_until(ttl: float, ts: float | None = None) -> float:
+    """Expiry for data that only moves while the market trades: ts + ttl during a
+    session (and while its closing prints settle), otherwise the next open."""
+    ts = time.time() if ts is None else ts
+    if is_open(ts) or ts < last_close(ts) + SETTLE_SECONDS:
+        return ts + ttl
+    return max(ts + ttl, next_open(ts))
+
+
+_build(date.today().year - 1, date.today().year + YEARS_AHEAD)
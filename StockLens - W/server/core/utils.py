@@ -1,4 +1,4 @@
-from datetime import datetime
-
-def utcnow():
+from datetime import datetime
+
+def utcnow():
     return datetime.utcnow()
\ No newline at end of file
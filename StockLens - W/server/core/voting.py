@@ -0,0 +1,263 @@
+"""
+Atomic vote state and counter updates.
+
+cast() changes a user's vote with one findOneAndUpdate pipeline on the vote
+document: `up` becomes True/False, or null when the same vote is cast again
+(undo), and `prev` keeps the state it replaced, so the counter deltas come
+out of the same atomic write. apply() then moves the entity's up/down
+counters and, for threads, recomputes reliabilityScore and hotness from the
+new counts in a single pipeline update on the entity.
+
+With VOTE_WRITE_BEHIND=1, counter deltas are summed per entity in-process and
+flushed every VOTE_FLUSH_MS as one unordered bulk_write, so a burst of votes
+on a hot thread costs one counter write instead of one per click. Vote state
+is always written synchronously; responses add the pending deltas to the
+stored counts.
+
+Vote state and counters are two writes, so a worker dying between them (or
+a lost write-behind buffer) leaves counters that disagree with `votes`.
+repair_counters() recounts them from the vote documents every
+VOTE_REPAIR_INTERVAL, skipping entities voted on in the last
+VOTE_REPAIR_GRACE seconds, whose counter writes may still be in flight.
+"""
+import atexit, os, threading, time
+from datetime import timedelta
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
+from core import encoded, hotness, scheduler, symbol_stats
+from core.db import comments, threads, votes
+from core.utils import utcnow
+
+WRITE_BEHIND = os.getenv("VOTE_WRITE_BEHIND", "0") not in ("0", "", "false", "False")
+FLUSH_MS = int(os.getenv("VOTE_FLUSH_MS", "250"))
+CAST_RETRIES = 3
+REPAIR_INTERVAL = float(os.getenv("VOTE_REPAIR_INTERVAL", "21600"))  # seconds
+REPAIR_GRACE = float(os.getenv("VOTE_REPAIR_GRACE", "60"))  # seconds
+
+_COLLS = {"thread": threads, "comment": comments}
+
+_lock = threading.Lock()
+_pending: dict = {}   # (type, oid) -> [d_up, d_down]
+_inflight: dict = {}  # same, while a flush is writing them
+_stats = {"votes": 0, "coalesced": 0, "flushes": 0, "writes": 0, "errors": 0, "repaired": 0}
+_started_pid = None
+
+
+def reliability(up: int, down: int) -> float:
+    return (up - down) / max(1, up + down + 5)
+
+
+def cast(user_id: str, typ: str, entity_id: str, up: bool):
+    """Record the user's vote and return (previous, current): True/False/None each.
+    An undone vote's document is deleted."""
+    key = {"userId": user_id, "type": typ, "entityId": entity_id}
+    pipeline = [
+        {"$set": {"prev": {"$ifNull": ["$up", None]}}},
+        {"$set": {
+            "up": {"$cond": [{"$eq": ["$prev", up]}, None, up]},  # same vote again: undo
+            "createdAt": {"$ifNull": ["$createdAt", utcnow()]},
+            "updatedAt": "$$NOW",
+        }},
+    ]
+    for attempt in range(CAST_RETRIES + 1):
+        try:
+            # upsert=True with AFTER always returns a document
+            doc = votes.find_one_and_update(key, pipeline, upsert=True, return_document=ReturnDocument.AFTER)
+            break
+        except DuplicateKeyError:
+            # a concurrent vote by the same user won the upsert (its insert has committed):
+            # retry, applying ours on top of it, or inserting again if an undo deleted it since
+            if attempt == CAST_RETRIES:
+                raise
+    if doc.get("up") is None:
+        # only if still undone: a newer vote by the same user keeps its document
+        votes.delete_one({**key, "up": None})
+    with _lock:
+        _stats["votes"] += 1
+    return doc.get("prev"), doc.get("up")
+
+
+def deltas(prev, now):
+    return int(now is True) - int(prev is True), int(now is False) - int(prev is False)
+
+
+def _counter_pipeline(d_up: int, d_down: int, rescore: bool) -> list:
+    return _counts_pipeline({"$add": [{"$ifNull": ["$up", 0]}, d_up]},
+                            {"$add": [{"$ifNull": ["$down", 0]}, d_down]}, rescore)
+
+
+def _counts_pipeline(up, down, rescore: bool) -> list:
+    pipeline = [{"$set": {"up": up, "down": down}}]
+    if rescore:
+        pipeline.append({"$set": {
+            "reliabilityScore": {"$divide": [
+                {"$subtract": ["$up", "$down"]}, {"$max": [1, {"$add": ["$up", "$down", 5]}]},
+            ]},
+            "hotness": hotness.expr(),
+        }})
+    return pipeline
+
+
+def apply(typ: str, oid, d_up: int, d_down: int):
+    """Move the entity's counters by the deltas; returns the entity as the voter should see it."""
+    coll = _COLLS[typ]
+    if WRITE_BEHIND:
+        _buffer(typ, oid, d_up, d_down)
+        doc = coll.find_one({"_id": oid})
+        if doc:
+            p_up, p_down = _unflushed(typ, oid)
+            doc["up"] = int(doc.get("up", 0)) + p_up
+            doc["down"] = int(doc.get("down", 0)) + p_down
+            if typ == "thread":
+                doc["reliabilityScore"] = reliability(doc["up"], doc["down"])
+                doc["hotness"] = hotness.score(doc["up"], doc["down"], doc.get("commentCount", 0), doc["createdAt"])
+        return doc
+
+    doc = coll.find_one_and_update({"_id": oid}, _counter_pipeline(d_up, d_down, typ == "thread"),
+                                   return_document=ReturnDocument.AFTER)
+    if doc and typ == "thread":
+        symbol_stats.thread_scored(doc)
+    encoded.bump("community")  # cached community list pages are now out of date
+    return doc
+
+
+# ---------- write-behind buffer ----------
+def _buffer(typ: str, oid, d_up: int, d_down: int):
+    _ensure_started()
+    with _lock:
+        d = _pending.get((typ, oid))
+        if d is None:
+            _pending[(typ, oid)] = [d_up, d_down]
+        else:
+            d[0] += d_up
+            d[1] += d_down
+            _stats["coalesced"] += 1
+
+
+def _unflushed(typ: str, oid):
+    with _lock:
+        a = _pending.get((typ, oid)) or (0, 0)
+        b = _inflight.get((typ, oid)) or (0, 0)
+        return a[0] + b[0], a[1] + b[1]
+
+
+def _requeue(items):
+    with _lock:
+        for key, (d_up, d_down) in items:
+            d = _pending.setdefault(key, [0, 0])
+            d[0] += d_up
+            d[1] += d_down
+        _stats["errors"] += 1
+
+
+def flush():
+    """Write all buffered counter deltas: one bulk_write per collection."""
+    global _pending
+    with _lock:
+        batch, _pending = _pending, {}
+        _inflight.update(batch)
+    try:
+        for typ, coll in _COLLS.items():
+            items = [(k, d) for k, d in batch.items() if k[0] == typ and (d[0] or d[1])]
+            if not items:
+                continue
+            ops = [UpdateOne({"_id": k[1]}, _counter_pipeline(d[0], d[1], typ == "thread")) for k, d in items]
+            try:
+                coll.bulk_write(ops, ordered=False)
+            except BulkWriteError as e:
+                failed = {err["index"] for err in e.details.get("writeErrors", [])}
+                _requeue([items[i] for i in sorted(failed)])
+            except PyMongoError:
+                _requeue(items)
+                continue
+            with _lock:
+                _stats["flushes"] += 1
+                _stats["writes"] += len(ops)
+            encoded.bump("community")
+            if typ == "thread":
+                ids = [k[1] for k, _ in items]
+                for t in threads.find({"_id": {"$in": ids}}, {"symbol": 1, "stance": 1, "reliabilityScore": 1}):
+                    symbol_stats.thread_scored(t)
+    finally:
+        with _lock:
+            for k in batch:
+                _inflight.pop(k, None)
+
+
+# ---------- repair ----------
+def _recount() -> dict:
+    """(type, entityId) -> (up, down, last vote time) counted from the vote documents."""
+    rows = votes.aggregate([{"$group": {
+        "_id": {"type": "$type", "id": "$entityId"},
+        "up": {"$sum": {"$cond": [{"$eq": ["$up", True]}, 1, 0]}},
+        "down": {"$sum": {"$cond": [{"$eq": ["$up", False]}, 1, 0]}},
+        "last": {"$max": "$updatedAt"},
+    }}])
+    return {(r["_id"]["type"], r["_id"]["id"]): (r["up"], r["down"], r["last"]) for r in rows}
+
+
+def repair_counters():
+    """Set every entity's up/down (and thread scores) back to what `votes` says."""
+    votes.delete_many({"up": None})  # undone votes written before they were deleted on undo
+    counted = _recount()
+    recent = utcnow() - timedelta(seconds=REPAIR_GRACE)
+    with _lock:
+        unflushed = set(_pending) | set(_inflight)
+    for typ, coll in _COLLS.items():
+        voted = {}
+        for (t, eid), c in counted.items():
+            if t == typ and ObjectId.is_valid(eid):
+                voted[ObjectId(eid)] = c
+        ids = set(voted)
+        ids.update(d["_id"] for d in coll.find({"$or": [{"up": {"$gt": 0}}, {"down": {"$gt": 0}}]}, {"_id": 1}))
+        ops, fixed = [], []
+        for d in coll.find({"_id": {"$in": list(ids)}}, {"up": 1, "down": 1}):
+            up, down, last = voted.get(d["_id"], (0, 0, None))
+            if (d.get("up", 0), d.get("down", 0)) == (up, down):
+                continue
+            if (last is not None and last > recent) or (typ, d["_id"]) in unflushed:
+                continue
+            # only if the counters haven't moved since they were read
+            ops.append(UpdateOne({"_id": d["_id"], "up": d.get("up"), "down": d.get("down")},
+                                 _counts_pipeline(up, down, typ == "thread")))
+            fixed.append(d["_id"])
+        if not ops:
+            continue
+        coll.bulk_write(ops, ordered=False)
+        with _lock:
+            _stats["repaired"] += len(ops)
+        encoded.bump("community")
+        if typ == "thread":
+            for t in threads.find({"_id": {"$in": fixed}}, {"symbol": 1, "stance": 1, "reliabilityScore": 1}):
+                symbol_stats.thread_scored(t)
+
+
+scheduler.at("vote-counter-repair", lambda: time.time() + REPAIR_INTERVAL, repair_counters)
+
+
+def _flush_forever():
+    while True:
+        time.sleep(FLUSH_MS / 1000)
+        try:
+            flush()
+        except Exception:
+            pass
+
+
+def _ensure_started():
+    # threads don't survive fork: start the flusher lazily in each worker
+    global _started_pid
+    if _started_pid == os.getpid():
+        return
+    with _lock:
+        if _started_pid == os.getpid():
+            return
+        threading.Thread(target=_flush_forever, name="vote-flush", daemon=True).start()
+        atexit.register(flush)
+        _started_pid = os.getpid()
+
+
+def stats() -> dict:
+    with _lock:
+        return {**_stats, "writeBehind": WRITE_BEHIND, "buffered": len(_pending)}
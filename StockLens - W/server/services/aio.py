@@ -0,0 +1,100 @@
+"""
+Asyncio upstream I/O path.
+
+Each worker process runs one event loop on a daemon thread. The loop owns a
+pooled httpx.AsyncClient. Sync Flask views hand it coroutines through run(),
+so the independent upstream calls of one request run concurrently. A process
+can then keep hundreds of upstream requests in flight without a thread for
+each. Timings go into the same per-host stats as services/http_client.py.
+"""
+import asyncio, os, threading, time
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+import httpx
+from services import http_client
+
+MAX_CONNECTIONS = int(os.getenv("AIO_MAX_CONNECTIONS", "200"))
+MAX_KEEPALIVE = int(os.getenv("AIO_MAX_KEEPALIVE", "50"))
+
+_lock = threading.Lock()
+_loop = None
+_loop_pid = None
+_client = None
+
+
+def _ensure_loop() -> asyncio.AbstractEventLoop:
+    # the loop thread doesn't survive fork: start one lazily per worker
+    global _loop, _loop_pid, _client
+    if _loop is not None and _loop_pid == os.getpid():
+        return _loop
+    with _lock:
+        if _loop is None or _loop_pid != os.getpid():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="aio-loop", daemon=True).start()
+            _loop, _loop_pid, _client = loop, os.getpid(), None
+    return _loop
+
+
+def _http() -> httpx.AsyncClient:
+    # only ever touched from the loop thread
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE),
+            timeout=httpx.Timeout(http_client.READ_TIMEOUT, connect=http_client.CONNECT_TIMEOUT),
+        )
+    return _client
+
+
+def run(coro, timeout: float | None = None):
+    """Run a coroutine on the worker's event loop and block for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _ensure_loop()).result(timeout)
+
+
+def gather(*coros, return_exceptions: bool = False):
+    """Run coroutines concurrently on the worker's loop; returns their results in order."""
+    async def _all():
+        return await asyncio.gather(*coros, return_exceptions=return_exceptions)
+    return run(_all())
+
+
+async def request(method: str, url: str, read_timeout: float | None = None, **kwargs) -> httpx.Response:
+    host = urlsplit(url).netloc
+    kwargs.setdefault("timeout", httpx.Timeout(read_timeout or http_client.READ_TIMEOUT,
+                                               connect=http_client.CONNECT_TIMEOUT))
+    t0 = time.perf_counter()
+    try:
+        r = await _http().request(method, url, **kwargs)
+    except Exception:
+        http_client.record(host, (time.perf_counter() - t0) * 1000, error=True)
+        raise
+    http_client.record(host, (time.perf_counter() - t0) * 1000, error=r.status_code >= 500)
+    return r
+
+
+async def get(url: str, **kwargs) -> httpx.Response:
+    return await request("GET", url, **kwargs)
+
+
+async def post(url: str, **kwargs) -> httpx.Response:
+    return await request("POST", url, **kwargs)
+
+
+@asynccontextmanager
+async def stream(method: str, url: str, read_timeout: float | None = None, **kwargs):
+    """request() with the body left unread: `async with stream(...) as r` then
+    r.aiter_lines(). Leaving the block, or cancelling the task inside it, closes
+    the connection. Timed to the response headers."""
+    host = urlsplit(url).netloc
+    timeout = httpx.Timeout(read_timeout or http_client.READ_TIMEOUT, connect=http_client.CONNECT_TIMEOUT)
+    t0 = time.perf_counter()
+    try:
+        r = await _http().send(_http().build_request(method, url, timeout=timeout, **kwargs), stream=True)
+    except Exception:
+        http_client.record(host, (time.perf_counter() - t0) * 1000, error=True)
+        raise
+    http_client.record(host, (time.perf_counter() - t0) * 1000, error=r.status_code >= 500)
+    try:
+        yield r
+    finally:
+        await r.aclose()
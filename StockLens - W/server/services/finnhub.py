@@ -1,17 +1,47 @@
-import requests
-from core.config import Config
-
-BASE = "https://finnhub.io/api/v1"
-
-
-def _params(extra=None):
-    p = {"token": Config.FINNHUB_API_KEY}
-    if extra:
-        p.update(extra)
-    return p
-
-
-def quote(symbol: str):
-    r = requests.get(f"{BASE}/quote", params=_params({"symbol": symbol}))
-    r.raise_for_status()
-    return r.json()
\ No newline at end of file
+from core.config import Config
+from core import breaker, ratelimit
+from services import aio, http_client
+
+BASE = "https://finnhub.io/api/v1"
+
+
+def _params(extra=None):
+    p = {"token": Config.FINNHUB_API_KEY}
+    if extra:
+        p.update(extra)
+    return p
+
+
+def quote(symbol: str, priority=ratelimit.INTERACTIVE):
+    def call():
+        ratelimit.finnhub.acquire(priority)
+        r = http_client.get(f"{BASE}/quote", params=_params({"symbol": symbol}))
+        r.raise_for_status()
+        return r.json()
+    return breaker.call("finnhub", call, retries=1, ignore=(ratelimit.RateLimited,))
+
+
+async def aquote(symbol: str, priority=ratelimit.INTERACTIVE):
+    async def call():
+        await ratelimit.finnhub.aacquire(priority)
+        r = await aio.get(f"{BASE}/quote", params=_params({"symbol": symbol}))
+        r.raise_for_status()
+        return r.json()
+    return await breaker.acall("finnhub", call, retries=1, ignore=(ratelimit.RateLimited,))
+
+def profile(symbol: str, priority=ratelimit.INTERACTIVE):
+    def call():
+        ratelimit.finnhub.acquire(priority)
+        r = http_client.get(f"{BASE}/stock/profile2", params=_params({"symbol": symbol}), read_timeout=8)
+        r.raise_for_status()
+        return r.json()
+    return breaker.call("finnhub", call, retries=1, ignore=(ratelimit.RateLimited,))
+
+
+async def aprofile(symbol: str, priority=ratelimit.INTERACTIVE):
+    async def call():
+        await ratelimit.finnhub.aacquire(priority)
+        r = await aio.get(f"{BASE}/stock/profile2", params=_params({"symbol": symbol}), read_timeout=8)
+        r.raise_for_status()
+        return r.json()
+    return await breaker.acall("finnhub", call, retries=1, ignore=(ratelimit.RateLimited,))
@@ -0,0 +1,91 @@
+"""
+Shared HTTP client for every upstream provider.
+
+One requests.Session per host with a sized keep-alive pool, so connections
+(and their TLS handshakes) are reused across calls instead of opened per
+request. Every call gets a connect and a read timeout, and is timed per host.
+
+Pool sizes: HTTP_POOL_MAXSIZE (default per host) and HTTP_POOL_SIZES, e.g.
+"finnhub.io=32,newsapi.org=8".
+"""
+import os, threading, time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "16"))
+POOL_SIZES = {
+    host.strip(): int(size)
+    for host, _, size in (p.partition("=") for p in os.getenv("HTTP_POOL_SIZES", "").split(","))
+    if host.strip() and size.strip().isdigit()
+}
+
+_lock = threading.Lock()
+_sessions: dict = {}  # host -> Session
+_timings: dict = {}   # host -> {"calls", "errors", "totalMs", "maxMs", "lastMs"}
+
+
+def _pool_size(host: str) -> int:
+    for suffix, size in POOL_SIZES.items():
+        if host == suffix or host.endswith("." + suffix):
+            return size
+    return POOL_MAXSIZE
+
+
+def session_for(host: str) -> requests.Session:
+    s = _sessions.get(host)
+    if s is not None:
+        return s
+    with _lock:
+        s = _sessions.get(host)
+        if s is None:
+            size = _pool_size(host)
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _sessions[host] = s
+    return s
+
+
+def record(host: str, ms: float, error: bool):
+    with _lock:
+        t = _timings.setdefault(host, {"calls": 0, "errors": 0, "totalMs": 0.0, "maxMs": 0.0, "lastMs": 0.0})
+        t["calls"] += 1
+        t["errors"] += int(error)
+        t["totalMs"] += ms
+        t["maxMs"] = max(t["maxMs"], ms)
+        t["lastMs"] = ms
+
+
+def request(method: str, url: str, read_timeout: float | None = None, **kwargs) -> requests.Response:
+    host = urlsplit(url).netloc
+    kwargs.setdefault("timeout", (CONNECT_TIMEOUT, read_timeout or READ_TIMEOUT))
+    t0 = time.perf_counter()
+    try:
+        r = session_for(host).request(method, url, **kwargs)
+    except Exception:
+        record(host, (time.perf_counter() - t0) * 1000, error=True)
+        raise
+    record(host, (time.perf_counter() - t0) * 1000, error=r.status_code >= 500)
+    return r
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def stats() -> dict:
+    with _lock:
+        return {
+            host: {**{k: round(v, 1) for k, v in t.items()},
+                   "avgMs": round(t["totalMs"] / t["calls"], 1) if t["calls"] else 0.0,
+                   "poolSize": _pool_size(host)}
+            for host, t in _timings.items()
+        }
@@ -0,0 +1,126 @@
+"""
+LLM dispatch with one end-to-end deadline per request, hedged across providers.
+
+generate() starts the primary provider (Ollama). If it hasn't answered by the
+hedge delay, the fallback (OpenAI) is started alongside it; an attempt that
+fails outright starts the next provider at once. The first non-empty answer
+wins. Attempts are tasks on the worker's event loop (services/aio.py), so the
+losers, and everything still running at the deadline, are cancelled where
+they are, waiting for headers or mid-stream, and their upstream connections
+closed right away. The hedge delay is the LLM_HEDGE_PERCENTILE of the
+provider's recent completion latencies, so it follows how fast it really is.
+"""
+import asyncio, os, threading, time
+from collections import deque
+from services import aio
+from services.ollama_client import astream_with_ollama
+from services.llm_fallback import astream_with_openai
+
+DEADLINE = float(os.getenv("LLM_DEADLINE", "15"))                 # seconds, per request
+HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.9"))
+HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "4"))            # until there are enough samples
+HEDGE_MIN = float(os.getenv("LLM_HEDGE_MIN", "0.5"))
+MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "10"))
+
+# in order of preference
+PROVIDERS = [("ollama", astream_with_ollama), ("openai", astream_with_openai)]
+
+_lock = threading.Lock()
+_latency = {name: deque(maxlen=200) for name, _ in PROVIDERS}  # seconds, successful completions
+_stats = {"requests": 0, "hedged": 0, "hedgeWins": 0, "deadlineMisses": 0, "failed": 0}
+
+
+def _percentile(samples: list, q: float) -> float:
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(q * len(s)))]
+
+
+def hedge_delay(name: str) -> float:
+    """Seconds to give `name` before racing the next provider against it."""
+    with _lock:
+        samples = list(_latency.get(name) or ())
+    if len(samples) < MIN_SAMPLES:
+        return HEDGE_DELAY
+    return max(HEDGE_MIN, _percentile(samples, HEDGE_PERCENTILE))
+
+
+async def _attempt(name: str, stream_fn, prompt: str):
+    t0 = time.perf_counter()
+    parts = []
+    async for chunk in stream_fn(prompt):
+        parts.append(chunk)
+    txt = "".join(parts).strip()
+    if txt:
+        with _lock:
+            _latency[name].append(time.perf_counter() - t0)
+    return txt or None
+
+
+async def _generate(prompt: str, deadline: float) -> str | None:
+    end = time.monotonic() + deadline
+    pending, running, hedged = list(PROVIDERS), {}, False
+
+    def start() -> float:
+        name, fn = pending.pop(0)
+        running[asyncio.ensure_future(_attempt(name, fn, prompt))] = name
+        return time.monotonic() + hedge_delay(name)  # when to race the next provider
+
+    with _lock:
+        _stats["requests"] += 1
+    hedge_at = start()
+    try:
+        while running or pending:
+            now = time.monotonic()
+            if now >= end:
+                with _lock:
+                    _stats["deadlineMisses"] += 1
+                return None
+            if not running:
+                hedge_at = start()  # everything so far failed outright: don't wait for the hedge delay
+                continue
+            done, _ = await asyncio.wait(running, timeout=min(end, hedge_at if pending else end) - now,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                if pending and time.monotonic() >= hedge_at:
+                    hedged = True
+                    with _lock:
+                        _stats["hedged"] += 1
+                    hedge_at = start()
+                continue
+            for task in done:
+                name = running.pop(task)
+                txt = None if task.exception() else task.result()
+                if txt:
+                    if hedged and name != PROVIDERS[0][0]:
+                        with _lock:
+                            _stats["hedgeWins"] += 1
+                    return txt
+        with _lock:
+            _stats["failed"] += 1
+        return None
+    finally:
+        # losers and late attempts stop now, not at their next chunk: the
+        # cancellation closes their connections wherever they are
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+
+def generate(prompt: str, deadline: float | None = None) -> str | None:
+    """First good completion across PROVIDERS within `deadline` seconds, or None."""
+    return aio.run(_generate(prompt, deadline or DEADLINE))
+
+
+def stats() -> dict:
+    with _lock:
+        lat = {name: sorted(s) for name, s in _latency.items()}
+        out = dict(_stats)
+    out["providers"] = {
+        name: {"samples": len(s),
+               "p50Ms": round(_percentile(s, 0.5) * 1000, 1) if s else None,
+               "p90Ms": round(_percentile(s, 0.9) * 1000, 1) if s else None,
+               "hedgeDelayMs": round(hedge_delay(name) * 1000, 1)}
+        for name, s in lat.items()
+    }
+    return out
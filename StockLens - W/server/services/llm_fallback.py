@@ -1,23 +1,69 @@
-import requests
-from core.config import Config
-
-
-def generate_with_openai(prompt):
-    if not Config.OPENAI_API_KEY:
-        return None
-    try:
-        r = requests.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers={"Authorization": f"Bearer {Config.OPENAI_API_KEY}"},
-            json={
-                "model": Config.OPENAI_MODEL,
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.2,
-            },
-            timeout=12,
-        )
-        r.raise_for_status()
-        j = r.json()
-        return j["choices"][0]["message"]["content"].strip()
-    except Exception:
-        return None
\ No newline at end of file
+import json
+from core import breaker
+from core.config import Config
+from services import aio, http_client
+
+
+def _request(prompt):
+    return (f"{Config.OPENAI_BASE_URL}/chat/completions",
+            {"Authorization": f"Bearer {Config.OPENAI_API_KEY}"},
+            {
+                "model": Config.OPENAI_MODEL,
+                "messages": [{"role": "user", "content": prompt}],
+                "temperature": 0.2,
+                "stream": True,
+            })
+
+
+def _parse(line: str):
+    """(content, done) from one SSE line of the streaming API."""
+    if not line.startswith("data: "):
+        return "", False
+    data = line[6:]
+    if data == "[DONE]":
+        return "", True
+    delta = (json.loads(data).get("choices") or [{}])[0].get("delta") or {}
+    return delta.get("content") or "", False
+
+
+def stream_with_openai(prompt):
+    """Yield completion text chunks from OpenAI's streaming API; raises on failure.
+
+    Yields nothing without an API key. Closing the generator closes the
+    upstream connection, which cancels the completion.
+    """
+    if not Config.OPENAI_API_KEY:
+        return iter(())
+    def chunks():
+        url, headers, body = _request(prompt)
+        r = http_client.post(url, headers=headers, json=body, read_timeout=12, stream=True)  # timeout per chunk
+        try:
+            r.raise_for_status()
+            for line in r.iter_lines(chunk_size=None):  # as chunks arrive, not 512-byte reads
+                text, done = _parse(line.decode())
+                if text:
+                    yield text
+                if done:
+                    return
+        finally:
+            r.close()
+    return breaker.stream("openai", chunks)
+
+
+async def astream_with_openai(prompt):
+    """stream_with_openai() on the worker's event loop. Cancelling the consuming
+    task closes the connection wherever the request is, even before the first chunk."""
+    if not Config.OPENAI_API_KEY:
+        return
+    async def chunks():
+        url, headers, body = _request(prompt)
+        async with aio.stream("POST", url, headers=headers, json=body, read_timeout=12) as r:
+            r.raise_for_status()
+            async for line in r.aiter_lines():
+                text, done = _parse(line)
+                if text:
+                    yield text
+                if done:
+                    return
+    async for chunk in breaker.astream("openai", chunks):
+        yield chunk
@@ -0,0 +1,161 @@
+"""
+News articles per symbol, shared by /api/stocks/news and the rankings.
+
+Articles are cached per symbol at the largest page size fetched so far
+(`covers`): smaller requests are slices of that entry, and only a larger
+one goes back to NewsAPI. The query includes the company name, which is
+cached separately for NEWS_NAME_TTL, so a news miss costs one upstream call
+instead of a profile lookup plus the search. The "name" OR symbol query
+returns overlapping hits (and wire stories syndicated under several URLs),
+so results are deduplicated by normalized URL and title.
+"""
+import os
+from urllib.parse import urlsplit
+from core import encoded, ratelimit, scheduler, singleflight
+from core.cache import LRUCache
+from core.config import Config
+from services import finnhub, newsapi
+
+NEWS_TTL = int(os.getenv("NEWS_TTL", "900"))
+NAME_TTL = int(os.getenv("NEWS_NAME_TTL", "604800"))
+NAME_MISS_TTL = int(os.getenv("NEWS_NAME_MISS_TTL", "3600"))
+FAIL_TTL = int(os.getenv("NEWS_FAIL_TTL", "300"))  # a failed NewsAPI call is retried after this
+
+_MB = 1024 * 1024
+# symbol -> {"covers": page size fetched, "articles": [...], "v": core/encoded.py stamp, "failed": bool}
+_ARTICLES = LRUCache("news", int(float(os.getenv("CACHE_NEWS_MB", "8")) * _MB),
+                     stale_ttl=int(os.getenv("NEWS_STALE_TTL", "3600")))
+# symbol -> company name ("" when the profile had none)
+_NAMES = LRUCache("company-names", int(float(os.getenv("CACHE_NAMES_MB", "1")) * _MB))
+
+
+# ---------- company names ----------
+def remember_name(symbol: str, name: str | None):
+    _NAMES.set(symbol, name or "", ttl=NAME_TTL if name else NAME_MISS_TTL)
+
+
+def _known_name(symbol: str):
+    """Stored name (also filled by /api/stocks/profile); "" if there is none and no key to look it up."""
+    name = _NAMES.get(symbol)
+    if name is None and not Config.FINNHUB_API_KEY:
+        return ""
+    return name
+
+
+def company_name(symbol: str, priority=ratelimit.INTERACTIVE) -> str:
+    name = _known_name(symbol)
+    if name is None:
+        try:
+            name = (finnhub.profile(symbol, priority) or {}).get("name") or ""
+        except Exception:
+            name = ""
+        remember_name(symbol, name)
+    return name
+
+
+async def acompany_name(symbol: str, priority=ratelimit.INTERACTIVE) -> str:
+    name = _known_name(symbol)
+    if name is None:
+        try:
+            name = (await finnhub.aprofile(symbol, priority) or {}).get("name") or ""
+        except Exception:
+            name = ""
+        remember_name(symbol, name)
+    return name
+
+
+def _query(symbol: str, name: str) -> str:
+    # favor the company name but keep the ticker; short enough for NewsAPI's query limit
+    return f"\"{name}\" OR {symbol}" if name else symbol
+
+
+# ---------- articles ----------
+def _dedupe(articles: list) -> list:
+    seen, out = set(), []
+    for a in articles:
+        u = urlsplit(a["url"])
+        keys = ((u.netloc.lower().removeprefix("www."), u.path.rstrip("/")),
+                " ".join(a["title"].lower().split()))
+        if any(k in seen for k in keys):
+            continue
+        seen.update(keys)
+        out.append(a)
+    return out
+
+
+def _store(symbol: str, covers: int, articles: list, failed: bool = False) -> dict:
+    entry = {"covers": covers, "articles": articles, "v": encoded.stamp(), "failed": failed}
+    _ARTICLES.set(symbol, entry, ttl=FAIL_TTL if failed else NEWS_TTL)
+    return entry
+
+
+def _failed(symbol: str, covers: int) -> dict:
+    """Soft-fail entry held for FAIL_TTL, so an outage doesn't send every view upstream:
+    the articles we had (even stale ones), else an empty entry marked failed."""
+    prev = _ARTICLES.get(symbol, allow_stale=True)
+    if prev is not None and not prev["failed"]:
+        _ARTICLES.set(symbol, prev, ttl=FAIL_TTL)
+        return prev
+    return _store(symbol, covers, [], failed=True)
+
+
+def _fetch(symbol: str, covers: int, priority=ratelimit.INTERACTIVE) -> dict:
+    if not Config.NEWSAPI_KEY:
+        return _store(symbol, covers, [])
+    q = _query(symbol, company_name(symbol, priority))
+    try:
+        return _store(symbol, covers, _dedupe(newsapi.everything(q, covers)))
+    except Exception:
+        return _failed(symbol, covers)
+
+
+async def _afetch(symbol: str, covers: int, priority=ratelimit.INTERACTIVE) -> dict:
+    if not Config.NEWSAPI_KEY:
+        return _store(symbol, covers, [])
+    q = _query(symbol, await acompany_name(symbol, priority))
+    try:
+        return _store(symbol, covers, _dedupe(await newsapi.aeverything(q, covers)))
+    except Exception:
+        return _failed(symbol, covers)
+
+
+def _lookup(symbol: str, limit: int):
+    """(entry or None on a miss, fresh, page size to fetch on a miss/refresh)."""
+    entry, fresh = _ARTICLES.lookup(symbol)
+    if entry is None or entry["covers"] < limit:
+        return None, False, max(limit, entry["covers"] if entry else 0)
+    return entry, fresh, entry["covers"]
+
+
+def _refresh(symbol: str, covers: int):
+    scheduler.submit(("news", symbol), lambda: singleflight.do(
+        ("news", symbol, covers), lambda: _fetch(symbol, covers, ratelimit.BACKGROUND)))
+
+
+def entry(symbol: str, limit: int = 8, priority=ratelimit.INTERACTIVE) -> dict:
+    """Cache entry covering at least `limit` articles; stale entries are refreshed in the background."""
+    cached, fresh, covers = _lookup(symbol, limit)
+    if cached is None:
+        # concurrent misses for the same symbol share one NewsAPI call
+        return singleflight.do(("news", symbol, covers), lambda: _fetch(symbol, covers, priority))
+    if not fresh:
+        _refresh(symbol, covers)
+    return cached
+
+
+def articles(symbol: str, limit: int = 8, priority=ratelimit.INTERACTIVE) -> list:
+    """Latest `limit` articles for `symbol`."""
+    return entry(symbol, limit, priority)["articles"][:limit]
+
+
+async def aarticles(symbol: str, limit: int = 8, priority=ratelimit.INTERACTIVE) -> list:
+    """articles() on the worker's event loop (services/aio.py)."""
+    cached, fresh, covers = _lookup(symbol, limit)
+    if cached is None:
+        # same singleflight keys as entry(): concurrent misses share one NewsAPI call
+        cached = await singleflight.ado(("news", symbol, covers), lambda: _afetch(symbol, covers, priority))
+    elif not fresh:
+        _refresh(symbol, covers)
+    if cached["failed"]:
+        raise RuntimeError(f"news for {symbol} unavailable")  # rankings count it as missing, not neutral
+    return cached["articles"][:limit]
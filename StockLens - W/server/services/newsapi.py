@@ -1,20 +1,64 @@
-import requests
-from core.config import Config
-
-BASE = "https://newsapi.org/v2/everything"
-
-def headlines_for_symbol(symbol: str, page_size: int = 10):
-    params = {
-        "q": symbol,
-        "sortBy": "publishedAt",
-        "pageSize": page_size,
-        "apiKey": Config.NEWSAPI_KEY,
-        "language": "en",
-    }
-    r = requests.get(BASE, params=params)
-    r.raise_for_status()
-    data = r.json()
-    return [
-        {"title": a.get("title"), "source": (a.get("source") or {}).get("name"), "url": a.get("url")}
-        for a in data.get("articles", [])
-    ]
\ No newline at end of file
+import time
+from datetime import datetime, timedelta, timezone
+from core import breaker
+from core.config import Config
+from services import aio, http_client
+
+BASE = "https://newsapi.org/v2/everything"
+READ_TIMEOUT = 10
+WINDOW_DAYS = 14
+
+
+def _query(q: str, page_size: int):
+    to_date = datetime.now(timezone.utc)
+    from_date = to_date - timedelta(days=WINDOW_DAYS)
+    return {
+        "q": q,
+        "sortBy": "publishedAt",
+        "pageSize": page_size,
+        "apiKey": Config.NEWSAPI_KEY,
+        "language": "en",
+        "from": from_date.isoformat(timespec="seconds").replace("+00:00", "Z"),
+        "to": to_date.isoformat(timespec="seconds").replace("+00:00", "Z"),
+    }
+
+
+def _published(a) -> int:
+    # epoch seconds for easy rendering client-side
+    try:
+        return int(datetime.fromisoformat((a.get("publishedAt") or "").replace("Z", "+00:00")).timestamp())
+    except ValueError:
+        return int(time.time())
+
+
+def _shape(data):
+    return [
+        {
+            "title": a.get("title"),
+            "url": a.get("url"),
+            "source": ((a.get("source") or {}).get("name") or "").strip(),
+            "publishedAt": _published(a),
+            "image": a.get("urlToImage") or "",
+            "description": (a.get("description") or a.get("content") or "").strip(),
+        }
+        for a in (data or {}).get("articles") or []
+        if a.get("title") and a.get("url")
+    ]
+
+
+def everything(q: str, page_size: int = 10):
+    params = _query(q, page_size)
+    def call():
+        r = http_client.get(BASE, params=params, read_timeout=READ_TIMEOUT)
+        r.raise_for_status()
+        return r.json()
+    return _shape(breaker.call("newsapi", call))
+
+
+async def aeverything(q: str, page_size: int = 10):
+    params = _query(q, page_size)
+    async def call():
+        r = await aio.get(BASE, params=params, read_timeout=READ_TIMEOUT)
+        r.raise_for_status()
+        return r.json()
+    return _shape(await breaker.acall("newsapi", call))
@@ -1,15 +1,59 @@
-import requests
-from core.config import Config
-
-
-def generate_with_ollama(prompt, model="mistral"):
-    try:
-        r = requests.post(
-            f"{Config.OLLAMA_HOST}/api/generate",
-            json={"model": model, "prompt": prompt, "stream": False},
-            timeout=12,
-        )
-        r.raise_for_status()
-        return (r.json() or {}).get("response", "").strip()
-    except Exception:
-        return None
\ No newline at end of file
+import json
+from core import breaker
+from core.config import Config
+from services import aio, http_client
+
+
+def _request(prompt, model):
+    return f"{Config.OLLAMA_HOST}/api/generate", {"model": model, "prompt": prompt, "stream": True}
+
+
+def _parse(line):
+    """(response text, done) from one NDJSON line; raises on an error line."""
+    msg = json.loads(line)
+    if msg.get("error"):
+        raise RuntimeError(f"ollama: {msg['error']}")
+    return msg.get("response") or "", bool(msg.get("done"))
+
+
+def stream_with_ollama(prompt, model="mistral"):
+    """Yield response text chunks as Ollama generates them; raises on failure.
+
+    Closing the generator closes the upstream connection, which stops the
+    generation on the Ollama side.
+    """
+    def chunks():
+        url, body = _request(prompt, model)
+        r = http_client.post(url, json=body, read_timeout=12, stream=True)  # timeout per chunk
+        try:
+            r.raise_for_status()
+            for line in r.iter_lines(chunk_size=None):  # as chunks arrive, not 512-byte reads
+                if not line:
+                    continue
+                text, done = _parse(line)
+                if text:
+                    yield text
+                if done:
+                    return
+        finally:
+            r.close()
+    return breaker.stream("ollama", chunks)
+
+
+async def astream_with_ollama(prompt, model="mistral"):
+    """stream_with_ollama() on the worker's event loop. Cancelling the consuming
+    task closes the connection wherever the request is, even before the first chunk."""
+    async def chunks():
+        url, body = _request(prompt, model)
+        async with aio.stream("POST", url, json=body, read_timeout=12) as r:
+            r.raise_for_status()
+            async for line in r.aiter_lines():
+                if not line:
+                    continue
+                text, done = _parse(line)
+                if text:
+                    yield text
+                if done:
+                    return
+    async for chunk in breaker.astream("ollama", chunks):
+        yield chunk
@@ -1,38 +1,64 @@
-# Community-first: include community stance signal.
-# Inputs: quote (Finnhub), community_score (-1..1), news_sentiment (-1..1)
-
-def compute_features(quote, community_score: float, news_sentiment: float):
-    f = {}
-    # Finnhub quote: dp = percent change
-    f["price_change"] = max(-1.0, min(1.0, (quote.get("dp", 0.0) or 0.0) / 10.0))
-    f["community"] = max(-1.0, min(1.0, community_score))
-    f["news"] = max(-1.0, min(1.0, news_sentiment))
-    return f
-
-
-def weighted_score(features):
-    # Tilt weight toward community as requested
-    weights = {"community": 0.5, "news": 0.3, "price_change": 0.2}
-    score = sum(features[k] * w for k, w in weights.items())
-    return score, weights
-
-
-def to_label(score):
-    if score >= 0.70:
-        return "Strong Buy"
-    if score >= 0.45:
-        return "Buy"
-    if score >= 0.30:
-        return "Hold"
-    return "Avoid"
-
-
-def rank_with_explain(features):
-    score, weights = weighted_score(features)
-    contributions = {k: round(features[k] * w, 4) for k, w in weights.items()}
-    return {
-        "score": round(score, 4),
-        "label": to_label(score),
-        "features": features,
-        "contributions": contributions,
-    }
\ No newline at end of file
+# Community-first: include community stance signal.
+# Inputs: quote (Finnhub), community_score (-1..1), news_sentiment (-1..1)
+import numpy as np
+
+# Tilt weight toward community as requested
+WEIGHTS = {"community": 0.5, "news": 0.3, "price_change": 0.2}
+FEATURES = tuple(WEIGHTS)
+# label cut-offs: score >= threshold gets the label to its right
+_THRESHOLDS = np.array([0.30, 0.45, 0.70])
+_LABELS = np.array(["Avoid", "Hold", "Buy", "Strong Buy"])
+
+
+def compute_features(quote, community_score: float, news_sentiment: float):
+    f = {}
+    # Finnhub quote: dp = percent change
+    f["price_change"] = max(-1.0, min(1.0, (quote.get("dp", 0.0) or 0.0) / 10.0))
+    f["community"] = max(-1.0, min(1.0, community_score))
+    f["news"] = max(-1.0, min(1.0, news_sentiment))
+    return f
+
+
+def weighted_score(features):
+    score = sum(features[k] * w for k, w in WEIGHTS.items())
+    return score, WEIGHTS
+
+
+def to_label(score):
+    if score >= 0.70:
+        return "Strong Buy"
+    if score >= 0.45:
+        return "Buy"
+    if score >= 0.30:
+        return "Hold"
+    return "Avoid"
+
+
+def rank_with_explain(features):
+    score, weights = weighted_score(features)
+    contributions = {k: round(features[k] * w, 4) for k, w in weights.items()}
+    return {
+        "score": round(score, 4),
+        "label": to_label(score),
+        "features": features,
+        "contributions": contributions,
+    }
+
+
+def rank_batch(dp, community, news):
+    """Vectorized compute_features + rank_with_explain over n symbols.
+
+    dp, community, news: length-n arrays (NaN dp counts as 0).
+    Returns (features, contributions, scores, labels); features and
+    contributions are (n, len(FEATURES)) with columns in FEATURES order.
+    """
+    cols = {
+        "price_change": np.nan_to_num(np.asarray(dp, dtype=float)) / 10.0,
+        "community": np.asarray(community, dtype=float),
+        "news": np.asarray(news, dtype=float),
+    }
+    features = np.clip(np.column_stack([cols[k] for k in FEATURES]), -1.0, 1.0)
+    contributions = features * np.array([WEIGHTS[k] for k in FEATURES])
+    scores = contributions.sum(axis=1)
+    labels = _LABELS[np.searchsorted(_THRESHOLDS, scores, side="right")]
+    return features, contributions, scores, labels
@@ -1,13 +1,150 @@
-# Placeholder sentiment: neutral 0.0. You can wire VADER/TextBlob later.
-# Expected return is in range [-1.0, 1.0].
-
-def headline_sentiment(headlines):
-    # naive: +0.1 if title contains "beat"; -0.1 if contains "miss"
-    score = 0.0
-    for h in headlines:
-        t = (h.get("title") or "").lower()
-        if "beat" in t:
-            score += 0.1
-        if "miss" in t:
-            score -= 0.1
-    return max(-1.0, min(1.0, score))
\ No newline at end of file
+"""
+Lexicon/rule-based headline sentiment.
+
+All lexicon terms, intensifiers and negators are compiled into one
+alternation regex. A batch of titles is normalized, joined with newlines and
+scanned with a single finditer pass, and each match is assigned back to its
+headline by offset. Rules, applied per lexicon hit:
+  - an intensifier directly before it scales its weight ("sharply lower");
+  - a negator up to NEGATION_WINDOW words before it flips and damps it
+    ("not expected to beat", "fails to meet");
+and a headline's summed weight is squashed into [-1, 1] with x / sqrt(x² + α).
+
+Scores depend only on the normalized title, so they are cached per title hash
+and a headline that shows up under several symbols is scored once.
+"""
+import hashlib, os, re
+from bisect import bisect_right
+from core.cache import LRUCache
+
+NEGATION_WINDOW = 3   # words between a negator and the term it flips
+NEGATION_SCALE = -0.74
+ALPHA = 15.0
+
+CACHE_TTL = int(os.getenv("SENTIMENT_CACHE_TTL", "86400"))
+_CACHE = LRUCache("sentiment", int(float(os.getenv("CACHE_SENTIMENT_MB", "2")) * 1024 * 1024))
+
+# ---------- lexicon ----------
+# "form|form|...": weight, on a -4..4 scale
+_LEXICON = {
+    # earnings / guidance
+    "beat|beats|beating|tops|topped|exceeds|exceeded|surpasses|surpassed": 2.0,
+    "meet|meets|met|in line": 0.8,
+    "miss|misses|missed|falls short|fell short|disappoints|disappointed|disappointing": -2.0,
+    "record profit|record revenue|record high|all-time high|blowout": 2.5,
+    "raises guidance|raised guidance|raises outlook|raised outlook|boosts guidance|hikes forecast": 2.5,
+    "cuts guidance|cut guidance|lowers guidance|lowered guidance|cuts outlook|slashes forecast": -2.5,
+    "profit warning|warns|warned|warning": -2.0,
+    "strong|stronger|robust|solid|healthy": 1.5,
+    "weak|weaker|weakness|soft|sluggish": -1.5,
+    # price action
+    "surge|surges|surged|surging|soar|soars|soared|soaring|skyrocket|skyrockets|skyrocketed": 2.5,
+    "jump|jumps|jumped|rally|rallies|rallied|spike|spikes|spiked": 2.0,
+    "rise|rises|rose|rising|gain|gains|gained|climb|climbs|climbed|up|higher|rebound|rebounds": 1.2,
+    "plunge|plunges|plunged|plunging|crash|crashes|crashed|tank|tanks|tanked|plummet|plummets|plummeted": -2.5,
+    "tumble|tumbles|tumbled|sink|sinks|sank|slump|slumps|slumped|sell-off|selloff": -2.0,
+    "fall|falls|fell|falling|drop|drops|dropped|decline|declines|declined|slide|slides|slid|down|lower": -1.2,
+    "52-week high|new high|breakout": 1.8,
+    "52-week low|new low": -1.8,
+    # analysts
+    "upgrade|upgrades|upgraded|outperform|overweight|buy rating|price target raised|raises price target": 2.0,
+    "downgrade|downgrades|downgraded|underperform|underweight|sell rating|price target cut|cuts price target": -2.0,
+    "bullish|optimistic|optimism|confident|confidence": 1.5,
+    "bearish|pessimistic|pessimism|concern|concerns|worried|worries|fears|fear": -1.5,
+    # corporate events
+    "growth|grows|grew|expands|expansion|profit|profitable|profits|dividend hike|buyback|share repurchase": 1.2,
+    "loss|losses|layoffs|lays off|job cuts|restructuring|bankruptcy|bankrupt|default|defaults|insolvency": -2.2,
+    "approval|approved|approves|wins|won|award|awarded|partnership|deal|breakthrough|launches": 1.3,
+    "lawsuit|sued|sues|probe|investigation|fraud|scandal|recall|recalls|fined|penalty|antitrust": -2.0,
+    "delay|delays|delayed|halt|halts|halted|suspends|suspended|shortage|disruption": -1.3,
+    "risk|risks|volatile|volatility|uncertainty|uncertain|headwinds": -1.0,
+    "tailwinds|momentum|upside|opportunity": 1.0,
+}
+_INTENSIFIERS = {
+    "very": 1.3, "sharply": 1.5, "significantly": 1.4, "strongly": 1.4, "hugely": 1.5,
+    "massive": 1.5, "huge": 1.4, "big": 1.2, "deeply": 1.4, "steep": 1.4, "steeply": 1.4,
+    "slightly": 0.6, "modestly": 0.7, "marginally": 0.6, "somewhat": 0.7, "slight": 0.6, "modest": 0.7,
+}
+_NEGATORS = ("not", "no", "never", "without", "isn't", "aren't", "wasn't", "won't", "doesn't", "didn't",
+             "don't", "can't", "cannot", "fails to", "failed to", "fail to", "unlikely to", "lack of")
+
+_WEIGHTS = {form: w for forms, w in _LEXICON.items() for form in forms.split("|")}
+_KIND = {**{t: "w" for t in _WEIGHTS}, **{t: "i" for t in _INTENSIFIERS}, **{t: "n" for t in _NEGATORS}}
+# longest first so phrases win over their first word
+_PATTERN = re.compile(r"(?<![\w-])(?:" + "|".join(map(re.escape, sorted(_KIND, key=len, reverse=True)))
+                      + r")(?![\w-])")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize(title: str) -> str:
+    return _SPACE.sub(" ", (title or "").lower().replace("’", "'")).strip()
+
+
+def _key(norm: str) -> bytes:
+    return hashlib.blake2b(norm.encode(), digest_size=12).digest()
+
+
+def _scan(norms: list) -> list:
+    """Score normalized titles in one regex pass over the joined batch."""
+    text = "\n".join(norms)
+    starts, pos = [], 0
+    for n in norms:
+        starts.append(pos)
+        pos += len(n) + 1
+    totals = [0.0] * len(norms)
+    row, neg_end, int_end, mult = -1, -1, -1, 1.0
+    for m in _PATTERN.finditer(text):
+        i = bisect_right(starts, m.start()) - 1
+        if i != row:  # negation and intensity never carry over to the next headline
+            row, neg_end, int_end = i, -1, -1
+        term = m.group()
+        kind = _KIND[term]
+        if kind == "n":
+            neg_end = m.end()
+        elif kind == "i":
+            int_end, mult = m.end(), _INTENSIFIERS[term]
+        else:
+            w = _WEIGHTS[term]
+            if int_end >= 0 and not text[int_end:m.start()].strip():
+                w *= mult
+            if neg_end >= 0 and len(text[neg_end:m.start()].split()) <= NEGATION_WINDOW:
+                w *= NEGATION_SCALE
+                neg_end = -1
+            totals[i] += w
+    return [x / (x * x + ALPHA) ** 0.5 for x in totals]
+
+
+# ---------- public API ----------
+def score_titles(titles) -> list:
+    """Sentiment in [-1, 1] for each title, in order. Cached per normalized title."""
+    norms = [normalize(t) for t in titles]
+    out, todo = [None] * len(norms), {}
+    for i, n in enumerate(norms):
+        k = _key(n)
+        v = _CACHE.get(k)
+        if v is None:
+            todo.setdefault(n, (k, []))[1].append(i)
+        else:
+            out[i] = v
+    if todo:
+        for (k, idx), v in zip(todo.values(), _scan(list(todo))):
+            _CACHE.set(k, v, ttl=CACHE_TTL)
+            for i in idx:
+                out[i] = v
+    return out
+
+
+def batch_sentiment(by_symbol: dict) -> dict:
+    """symbol -> [headline, ...] in, symbol -> mean headline sentiment out; all scored in one pass."""
+    titles, spans = [], {}
+    for sym, headlines in by_symbol.items():
+        ts = [h.get("title") for h in headlines or () if h.get("title")]
+        spans[sym] = (len(titles), len(titles) + len(ts))
+        titles.extend(ts)
+    scores = score_titles(titles)
+    return {sym: (sum(scores[a:b]) / (b - a) if b > a else 0.0) for sym, (a, b) in spans.items()}
+
+
+def headline_sentiment(headlines) -> float:
+    """Mean sentiment of one symbol's headlines, in [-1.0, 1.0]."""
+    return batch_sentiment({None: headlines})[None]
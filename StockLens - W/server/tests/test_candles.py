@@ -0,0 +1,56 @@
+"""
+Candle history across providers. Needs a MongoDB at TEST_MONGO_URI
+(default mongodb://localhost:27017/stocklens_test); skipped without one.
+"""
+import os
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+MONGO_URI = os.getenv("TEST_MONGO_URI", "mongodb://localhost:27017/stocklens_test")
+try:
+    MongoClient(MONGO_URI, serverSelectionTimeoutMS=500).admin.command("ping")
+except PyMongoError:
+    pytest.skip("no MongoDB at TEST_MONGO_URI", allow_module_level=True)
+os.environ["MONGO_URI"] = MONGO_URI
+
+from blueprints import stocks  # noqa: E402
+from core.db import candles, candle_series  # noqa: E402
+
+DAY = 86400
+T0 = 1792281600 - 179 * DAY  # 180 daily sessions ending Oct 17 00:00 UTC
+
+
+def _bars(source, ts):
+    n = len(ts)
+    return {"ok": True, "symbol": "TEST", "s": "ok", "t": ts,
+            "o": [1.0] * n, "h": [2.0] * n, "l": [0.5] * n, "c": [float(i) for i in range(n)],
+            "meta": {"source": source, "resolution": "D", "count": n}}
+
+
+@pytest.fixture(autouse=True)
+def clean():
+    candles.delete_many({"symbol": "TEST"})
+    candle_series.delete_many({"_id": "TEST:D"})
+    yield
+    candles.delete_many({"symbol": "TEST"})
+    candle_series.delete_many({"_id": "TEST:D"})
+
+
+def test_yahoo_delta_after_finnhub_history(monkeypatch):
+    finnhub_ts = [T0 + i * DAY for i in range(180)]          # 00:00 UTC
+    yahoo_ts = [finnhub_ts[-1] + 13 * 3600 + 1800]           # 09:30 ET open of the last session
+    calls = []
+
+    def fetch(symbol, resolution, count, since=None, priority=None):
+        calls.append(since)
+        return _bars("finnhub", finnhub_ts) if since is None else _bars("yahoo", yahoo_ts)
+
+    monkeypatch.setattr(stocks, "_fetch_candles", fetch)
+    stocks._fetch_and_store_candles("TEST", "D", 180)
+    shaped = stocks._fetch_and_store_candles("TEST", "D", 180)
+
+    assert calls == [None, finnhub_ts[-1]]
+    assert shaped["t"] == finnhub_ts
+    assert shaped["meta"]["source"] == "yahoo"
+    assert candles.count_documents({"symbol": "TEST", "resolution": "D"}) == 180